@@ -0,0 +1,73 @@
+"""
+基准测试共用的样本生成函数
+"""
+
+import os
+import random
+import struct
+from pathlib import Path
+
+# 一个静音的MPEG-1 Layer III帧（128kbps / 44.1kHz）
+MPEG_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+
+def make_mp3(path, frames=20, title='Sample', artist='SMPE', album=None, track=None,
+             lyrics=None, cover_size=0, extra=()):
+    """
+    写一个带ID3标签的MP3样本：frames 个静音帧，cover_size 字节的随机封面（0为无封面）
+    extra 为额外添加的ID3帧
+    """
+    from mutagen.id3 import ID3, TIT2, TPE1, TALB, TRCK, USLT, APIC
+
+    path = Path(path)
+    path.write_bytes(MPEG_FRAME * frames)
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text=title))
+    tags.add(TPE1(encoding=3, text=artist))
+    if album is not None:
+        tags.add(TALB(encoding=3, text=album))
+    if track is not None:
+        tags.add(TRCK(encoding=3, text=track))
+    if lyrics is not None:
+        tags.add(USLT(encoding=3, lang='eng', desc='', text=lyrics))
+    if cover_size:
+        tags.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='', data=os.urandom(cover_size)))
+    for frame in extra:
+        tags.add(frame)
+    tags.save(path)
+    return path
+
+
+def make_flac(path, seconds=1, tags=None):
+    """
+    写一个只有STREAMINFO和Vorbis注释的FLAC样本（44.1kHz / 16bit 单声道，无音频帧）
+    tags 为 {Vorbis注释键: 值}
+    """
+    from mutagen.flac import FLAC
+
+    path = Path(path)
+    samples = 44100 * seconds
+    # 采样率20位 | 声道数-1 3位 | 位深-1 5位 | 总采样数36位
+    stream = (44100 << 44) | (0 << 41) | (15 << 36) | samples
+    info = struct.pack('>HH', 4096, 4096) + b'\x00' * 6 + stream.to_bytes(8, 'big') + b'\x00' * 16
+    path.write_bytes(b'fLaC' + bytes([0x80, 0, 0, len(info)]) + info)
+    audio = FLAC(path)
+    audio.add_tags()
+    for key, value in (tags or {}).items():
+        audio[key] = value
+    audio.save()
+    return path
+
+def make_library(directory, count, frames=20, dirs=10, cover_size=0, shuffle=False):
+    """
+    在 directory 下生成 count 个MP3样本（d<序号 % dirs>/<序号>.mp3）
+    shuffle 为真时按随机顺序创建，使文件名顺序与磁盘位置不一致
+    """
+    order = list(range(count))
+    if shuffle:
+        random.shuffle(order)
+    for i in order:
+        path = Path(directory) / f"d{i % dirs:02d}" / f"{i:05d}.mp3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        make_mp3(path, frames, title=f'Song {i}', album='Bench', track=str(i), cover_size=cover_size)
+    return Path(directory)
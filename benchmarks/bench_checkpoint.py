@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+检查点开销基准测试
+在同一批样本上比较不写检查点与不同检查点间隔下的扫描吞吐量
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import smpe_batch  # noqa: E402
+from _samples import make_library  # noqa: E402
+
+
+def run_scan(manifest, output_dir, every):
+    """执行一次单分片扫描，返回耗时（秒）"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(None):
+        smpe_batch.scan_shard(manifest, 0, 1, output_dir, checkpoint_every=every)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SMPE 检查点开销基准')
+    parser.add_argument('-n', '--files', type=int, default=2000, help='样本文件数')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='每种配置重复次数（取最快）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        library = Path(tmp) / 'library'
+        library.mkdir()
+        make_library(library, args.files)
+        manifest = Path(tmp) / 'manifest.txt'
+        smpe_batch.build_manifest(library, manifest)
+
+        configs = [('不写检查点', 10 ** 9), ('每1000个', 1000), ('每100个', 100)]
+        results = {label: float('inf') for label, _ in configs}
+
+        # 预热一次，之后交替运行各配置，减少缓存状态造成的偏差
+        run_scan(manifest, Path(tmp) / 'out', 10 ** 9)
+        for _ in range(args.repeat):
+            for label, every in configs:
+                elapsed = run_scan(manifest, Path(tmp) / 'out', every)
+                results[label] = min(results[label], elapsed)
+
+    baseline = results[configs[0][0]]
+    for label, elapsed in results.items():
+        overhead = (elapsed / baseline - 1) * 100
+        print(f"{label:8s}: {args.files / elapsed:8.0f} 文件/秒  开销 {overhead:+5.1f}%")
+
+
+if __name__ == '__main__':
+    main()
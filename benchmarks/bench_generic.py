@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+通用解析路径字段提取基准测试
+比较旧版逐字段探测（5个字段）与预编译查找计划（TAG_SCHEMA全部字段）的耗时
+只测量字段提取阶段，mutagen加载文件的开销不计入
+"""
+
+import sys
+import struct
+import timeit
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from smpe_core import MusicMetadataExtractor, TAG_SCHEMA, tag_family  # noqa: E402
+from _samples import make_mp3  # noqa: E402
+
+
+LEGACY_FIELDS = {
+    'title': ['title', 'TIT2', '©nam'],
+    'artist': ['artist', 'TPE1', '©ART'],
+    'album': ['album', 'TALB', '©alb'],
+    'track': ['tracknumber', 'TRCK', 'trkn'],
+    'disc': ['discnumber', 'TPOS', 'disk']
+}
+
+
+def legacy_probe(audio, metadata):
+    """旧版 _parse_generic 的字段探测逻辑（作为对照）"""
+    for meta_key, field_list in LEGACY_FIELDS.items():
+        for field in field_list:
+            try:
+                if hasattr(audio, 'tags') and field in audio.tags:
+                    value = audio.tags[field]
+                    if hasattr(value, 'text'):
+                        metadata[meta_key] = value.text[0]
+                        break
+                    elif isinstance(value, list) and value:
+                        metadata[meta_key] = value[0]
+                        break
+                elif field in audio:
+                    value = audio[field]
+                    if isinstance(value, list) and value:
+                        metadata[meta_key] = value[0]
+                        break
+            except:
+                continue
+
+
+def make_samples(directory):
+    """生成带常见标签的MP3和FLAC样本"""
+    from mutagen.id3 import TPOS, TCON, TDRC, TSRC, TXXX
+    from mutagen.flac import FLAC
+
+    mp3 = make_mp3(Path(directory) / 'sample.mp3', frames=40, title='TIT2', artist='TPE1',
+                   album='TALB', track='3/12', extra=(
+                       TCON(encoding=3, text='TCON'),
+                       TPOS(encoding=3, text='1/2'),
+                       TDRC(encoding=3, text='2001-05-01'),
+                       TSRC(encoding=3, text='USABC0000001'),
+                       TXXX(encoding=3, desc='REPLAYGAIN_TRACK_GAIN', text='-6.5 dB'),
+                   ))
+
+    flac = Path(directory) / 'sample.flac'
+    streaminfo = struct.pack('>HH', 4096, 4096) + b'\x00' * 6 + b'\x0a\xc4\x42\xf0' + b'\x00' * 20
+    flac.write_bytes(b'fLaC' + b'\x80\x00\x00\x22' + streaminfo)
+    audio = FLAC(flac)
+    for key in ('title', 'artist', 'album', 'genre', 'composer', 'isrc'):
+        audio[key] = key
+    audio['tracknumber'] = '3'
+    audio['discnumber'] = '1'
+    audio['date'] = '2001'
+    audio['replaygain_track_gain'] = '-6.5 dB'
+    audio['comment'] = ['x'] * 10
+    audio.save()
+    return [mp3, flac]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SMPE 通用解析字段提取基准')
+    parser.add_argument('-n', '--number', type=int, default=20000, help='每组重复次数')
+    args = parser.parse_args()
+
+    from mutagen import File
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in make_samples(tmp):
+            audio = File(path)
+            extractor = MusicMetadataExtractor(path)
+            family = tag_family(audio.tags)
+
+            legacy = timeit.timeit(lambda: legacy_probe(audio, {}), number=args.number)
+            planned = timeit.timeit(lambda: extractor._apply_field_plan(audio.tags, family),
+                                    number=args.number)
+
+            per_legacy = legacy / args.number * 1e6
+            per_planned = planned / args.number * 1e6
+            print(f"{path.suffix[1:].upper():5s} 旧版探测 {len(LEGACY_FIELDS)} 字段: {per_legacy:6.2f} µs/文件 | "
+                  f"查找计划 {len(TAG_SCHEMA)} 字段: {per_planned:6.2f} µs/文件 | "
+                  f"{per_legacy / per_planned:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
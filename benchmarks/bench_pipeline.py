@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+流水线内存基准测试
+用同一个带大封面的样本建立大量硬链接，配合一个慢速导出器（只睡眠、不写盘），
+比较不同文件数下扫描进程的峰值RSS，验证在途数据受内存预算约束而不随文件数增长
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import resource
+import tempfile
+import subprocess
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import smpe_core as smpe  # noqa: E402
+import smpe_batch  # noqa: E402
+from _samples import make_mp3  # noqa: E402
+
+
+# 每个样本最多硬链接的次数（ext4 单个inode的链接数上限为65000）
+LINKS_PER_SAMPLE = 50000
+
+
+def link_library(directory, count, cover_kb):
+    """生成带封面的MP3样本，再硬链接出count个文件"""
+    directory = Path(directory)
+    sample = make_mp3(directory / 'sample.mp3', frames=10, cover_size=cover_kb * 1024)
+
+    library = directory / 'library'
+    source = sample
+    for i in range(count):
+        if i and i % LINKS_PER_SAMPLE == 0:
+            source = directory / f"sample{i // LINKS_PER_SAMPLE}.mp3"
+            shutil.copyfile(sample, source)
+        path = library / f"d{i // 1000:04d}" / f"{i:07d}.mp3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.link(source, path)
+    return library
+
+
+def peak_rss_mb():
+    """
+    本进程的峰值RSS（MB）
+    Linux 上读 /proc 的 VmHWM：ru_maxrss 会保留 fork 时父进程的峰值（父进程生成过清单）
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(args):
+    """子进程：执行一次扫描并输出峰值RSS和流水线指标"""
+    def slow_export(metadata, base_dir=".", verbose=True):
+        time.sleep(args.export_ms / 1000)
+        return True
+
+    smpe.MetadataSaver.save_all = staticmethod(slow_export)
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(None):
+            smpe_batch.scan_shard(args.manifest, 0, 1, tmp, workers=args.workers,
+                                  memory_budget=args.budget * 1048576, export_dir=tmp,
+                                  metrics_path=Path(tmp) / 'metrics.jsonl')
+            metrics = (Path(tmp) / 'metrics.jsonl').read_text().splitlines()[-1]
+    print(json.dumps({'rss_mb': peak_rss_mb(), 'metrics': json.loads(metrics)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SMPE 流水线内存基准')
+    parser.add_argument('--counts', default='500,2000,8000', help='逗号分隔的文件数')
+    parser.add_argument('--cover-kb', type=int, default=1024, help='样本封面大小（KB）')
+    parser.add_argument('--budget', type=int, default=64, help='内存预算（MB）')
+    parser.add_argument('--workers', type=int, default=4, help='解析线程数')
+    parser.add_argument('--export-ms', type=float, default=1.0, help='慢速导出器每条耗时（毫秒）')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--manifest', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return 0
+
+    print(f"封面 {args.cover_kb} KB, 预算 {args.budget} MB, 解析线程 {args.workers}, "
+          f"导出 {args.export_ms} ms/条")
+    for count in (int(c) for c in args.counts.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            library = link_library(tmp, count, args.cover_kb)
+            manifest = Path(tmp) / 'manifest.txt'
+            smpe_batch.build_manifest(library, manifest)
+            start = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', '--manifest', str(manifest),
+                 '--budget', str(args.budget), '--workers', str(args.workers),
+                 '--export-ms', str(args.export_ms)],
+                check=True, capture_output=True, text=True).stdout
+            elapsed = time.perf_counter() - start
+        result = json.loads(out)
+        memory = result['metrics']['memory']
+        blocked = memory['blocked_seconds'] + result['metrics']['queues']['transform']['blocked_seconds']
+        print(f"{count:7d} 个文件: 峰值RSS {result['rss_mb']:6.1f} MB  "
+              f"在途峰值 {memory['peak'] / 1048576:5.1f} MB  "
+              f"解析线程累计背压 {blocked:5.1f} 秒  耗时 {elapsed:5.1f} 秒")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+命令行冷启动基准测试
+测量 `extract` 子命令从启动进程到标准输出第一行的耗时，并与预算比较
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+from _samples import make_mp3
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'music_metadata_mp3_fixed.py'
+
+
+def time_to_first_output(cmd):
+    """运行命令，返回读到第一行输出的耗时（毫秒）"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    proc.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    proc.stdout.read()
+    proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"命令执行失败: {' '.join(map(str, cmd))}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SMPE 命令行冷启动基准')
+    parser.add_argument('-n', '--runs', type=int, default=20, help='测量次数')
+    parser.add_argument('--budget', type=float, default=100.0, help='首行输出耗时预算（毫秒）')
+    parser.add_argument('file', nargs='?', help='待提取的音乐文件（默认自动生成MP3样本）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = Path(args.file) if args.file else make_mp3(Path(tmp) / 'sample.mp3', frames=40, lyrics='[00:00.00]la')
+        cmd = [sys.executable, str(SCRIPT), 'extract', str(sample)]
+        baseline_cmd = [sys.executable, '-c', 'print()']
+
+        # 预热一次，让 .pyc 与文件系统缓存就绪
+        time_to_first_output(cmd)
+
+        interpreter = [time_to_first_output(baseline_cmd) for _ in range(args.runs)]
+        samples = [time_to_first_output(cmd) for _ in range(args.runs)]
+
+    median = statistics.median(samples)
+    print(f"解释器空启动: 中位数 {statistics.median(interpreter):.1f} ms")
+    print(f"extract 首行输出: 中位数 {median:.1f} ms, "
+          f"最小 {min(samples):.1f} ms, 最大 {max(samples):.1f} ms ({args.runs} 次)")
+    print(f"预算: {args.budget:.0f} ms -> {'✅ 通过' if median <= args.budget else '❌ 超出'}")
+    return 0 if median <= args.budget else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1295 @@
+"""
+SMPE 批量扫描模块：文件清单与分片、ZIP/TAR归档扫描、I/O调度、流式流水线、检查点与合并
+
+命令行的 manifest / scan / merge 子命令按需导入本模块，单文件提取不需要加载和编译这部分代码
+"""
+
+import os
+import sys
+import io
+import errno
+import json
+import time
+import heapq
+import queue
+import struct
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+import threading
+import contextlib
+import subprocess
+from pathlib import Path
+
+from smpe_core import (
+    BATCH_COMMANDS, MusicMetadataExtractor, MetadataSaver, ARCHIVE_SEPARATOR,
+    _cover_bytes, metadata_to_record, extract_quiet, is_archive, split_archive_entry
+)
+
+# ==================== 归档成员读取 ====================
+
+class RangeReader(io.RawIOBase):
+    """只读、可seek的文件区间视图（用于未压缩的归档成员，直接定位读取）"""
+    
+    def __init__(self, fileobj, start, size, name=''):
+        self._fileobj = fileobj
+        self._start = start
+        self._size = size
+        self._pos = 0
+        self.name = name
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        size = max(min(len(buffer), self._size - self._pos), 0)
+        if size == 0:
+            return 0
+        self._fileobj.seek(self._start + self._pos)
+        view = memoryview(buffer).cast('B')
+        read = self._fileobj.readinto(view[:size]) or 0
+        self._pos += read
+        return read
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"无效的whence: {whence}")
+        if pos < 0:
+            raise OSError(errno.EINVAL, "seek位置不能为负数")
+        self._pos = pos
+        return pos
+    
+    def tell(self):
+        return self._pos
+
+
+# 压缩成员解压后缓存的头部大小（标签基本都位于文件开头）
+MEMBER_HEAD_CACHE = 8 * 1024 * 1024
+# 缓存的尾部大小（ID3v1 / APEv2 标签位于文件末尾）
+MEMBER_TAIL_CACHE = 256 * 1024
+
+
+def _id3v2_size(header):
+    """根据文件开头10字节计算ID3v2标签总长度（含标签头和标签尾），不是ID3v2时返回0"""
+    if len(header) < 10 or header[:3] != b'ID3':
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7f)
+    return size + 10 + (10 if header[5] & 0x10 else 0)
+
+
+class StreamMemberReader(io.RawIOBase):
+    """
+    压缩归档成员的只读视图：按需流式解压，只解压到被读取的位置
+    头部和尾部区域缓存在内存中，在这两段内来回seek不会重新解压；
+    开头的ID3v2标签（可能带有大封面）总是完整缓存在头部，不受 head_limit 限制；
+    opener 为 None 表示数据流不可重开（如压缩tar的流模式），此时无法回退到头部缓存之外
+    """
+    
+    def __init__(self, stream, size, name='', opener=None, head_limit=MEMBER_HEAD_CACHE):
+        self._stream = stream
+        self._stream_pos = 0
+        self._opener = opener
+        self._head = bytearray()
+        self._head_limit = head_limit
+        self._tail = bytearray()
+        self._tail_start = max(size - MEMBER_TAIL_CACHE, 0)
+        self._size = size
+        self._pos = 0
+        self.name = name
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        end = min(self._pos + len(view), self._size)
+        filled = 0
+        
+        # 先从头部缓存取
+        if self._pos < len(self._head) and self._pos < end:
+            chunk = min(end, len(self._head)) - self._pos
+            view[:chunk] = self._head[self._pos:self._pos + chunk]
+            self._pos += chunk
+            filled = chunk
+        
+        # 完全落在已缓存尾部内的读取
+        tail_end = self._tail_start + len(self._tail)
+        if self._tail_start <= self._pos < end <= tail_end:
+            offset = self._pos - self._tail_start
+            chunk = end - self._pos
+            view[filled:filled + chunk] = self._tail[offset:offset + chunk]
+            self._pos += chunk
+            return filled + chunk
+        
+        # 剩余部分从解压流读取
+        if self._pos < end:
+            data = self._read_stream(self._pos, end - self._pos)
+            view[filled:filled + len(data)] = data
+            self._pos += len(data)
+            filled += len(data)
+        return filled
+    
+    def _read_stream(self, pos, size):
+        """从解压流的pos位置读取size字节（必要时跳过或重开数据流）"""
+        if pos < self._stream_pos:
+            if self._opener is None:
+                raise io.UnsupportedOperation("压缩数据流不可回退到头部缓存之外")
+            self._stream.close()
+            self._stream = self._opener()
+            self._stream_pos = 0
+        
+        while self._stream_pos < pos:
+            chunk = self._stream.read(min(pos - self._stream_pos, 1 << 16))
+            if not chunk:
+                return b''
+            self._absorb(chunk)
+        
+        data = self._stream.read(size)
+        self._absorb(data)
+        return data
+    
+    def _absorb(self, chunk):
+        """记录已解压的数据，连续且未超过上限的部分加入头部缓存，末尾部分加入尾部缓存"""
+        if self._stream_pos == len(self._head) and len(self._head) < self._head_limit:
+            if self._stream_pos < 10 <= self._stream_pos + len(chunk):
+                # 解析器读完文件末尾的标签后会回到ID3v2标签之后查找音频帧
+                self._head_limit += _id3v2_size(bytes(self._head) + chunk[:10])
+            self._head += chunk[:self._head_limit - len(self._head)]
+        end = self._stream_pos + len(chunk)
+        if end > self._tail_start and self._stream_pos <= self._tail_start + len(self._tail):
+            self._tail += chunk[self._tail_start + len(self._tail) - self._stream_pos:]
+        self._stream_pos = end
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"无效的whence: {whence}")
+        if pos < 0:
+            raise OSError(errno.EINVAL, "seek位置不能为负数")
+        self._pos = pos
+        return pos
+    
+    def tell(self):
+        return self._pos
+
+
+# ==================== 批量扫描（分片 / 合并） ====================
+
+AUDIO_EXTENSIONS = (
+    '.mp3', '.flac', '.m4a', '.mp4', '.ogg', '.opus',
+    '.wav', '.aiff', '.aif', '.ape', '.wv', '.wma', '.mpc', '.aac'
+)
+
+MANIFEST_ROOT_PREFIX = '# root: '
+
+
+def build_manifest(root, manifest_path, extensions=AUDIO_EXTENSIONS, include_archives=True):
+    """
+    遍历目录生成文件清单（相对路径，按字典序排序）
+    include_archives 为真时展开ZIP/TAR归档，成员以 'archive!member' 形式列出
+    条目先写入临时文件再外部排序，不在内存中保留整个清单
+    """
+    root = Path(root).resolve()
+    tmp_dir = Path(manifest_path).parent
+    count = 0
+    with tempfile.TemporaryFile(dir=tmp_dir) as unsorted:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in filenames:
+                rel = Path(dirpath, name).relative_to(root).as_posix()
+                if Path(name).suffix.lower() in extensions:
+                    entries = [rel]
+                elif include_archives and is_archive(name):
+                    try:
+                        members = iter_archive_members(Path(dirpath, name), extensions)
+                    except Exception as e:
+                        print(f"⚠️  无法读取归档 {rel}: {e}")
+                        continue
+                    entries = [f"{rel}{ARCHIVE_SEPARATOR}{member}" for member in members]
+                else:
+                    continue
+                unsorted.writelines((entry + "\n").encode('utf-8') for entry in entries)
+                count += len(entries)
+        unsorted.seek(0)
+
+        with open(manifest_path, 'wb') as f:
+            f.write(f"{MANIFEST_ROOT_PREFIX}{root.as_posix()}\n".encode('utf-8'))
+            _external_sort(unsorted, f, _entry_key, tmp_dir)
+    return count
+
+
+def read_manifest(manifest_path):
+    """读取文件清单，返回 (根目录, 条目迭代器)；条目逐行读取，不把整个清单载入内存"""
+    root = None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        if first.startswith(MANIFEST_ROOT_PREFIX):
+            root = first[len(MANIFEST_ROOT_PREFIX):].rstrip('\n')
+    return root, _iter_manifest(manifest_path)
+
+
+def _iter_manifest(manifest_path):
+    """逐行产出清单条目（跳过空行和 # 开头的注释行，包括根目录行）"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                yield line.rstrip('\n')
+
+
+def shard_of(entry, num_shards):
+    """
+    根据清单条目计算稳定的分片编号（与机器、进程、PYTHONHASHSEED无关）
+    同一归档内的成员按归档路径分片，保证每个归档只被一个分片顺序读取一次
+    """
+    key, _ = split_archive_entry(entry)
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % num_shards
+
+
+def shard_file_name(shard_index, num_shards):
+    """分片输出文件名"""
+    return f"part-{shard_index:05d}-of-{num_shards:05d}.jsonl"
+
+
+# ==================== 归档扫描（ZIP / TAR） ====================
+
+def _is_audio(name, extensions=AUDIO_EXTENSIONS):
+    return Path(name).suffix.lower() in extensions
+
+
+def iter_archive_members(archive_path, extensions=AUDIO_EXTENSIONS):
+    """列出归档中的音频成员名（只读取目录/头信息，不解压数据）"""
+    archive_path = str(archive_path)
+    if archive_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as zf:
+            return [info.filename for info in zf.infolist()
+                    if not info.is_dir() and _is_audio(info.filename, extensions)]
+
+    mode = 'r:' if archive_path.lower().endswith('.tar') else 'r|*'
+    with tarfile.open(archive_path, mode) as tf:
+        return [member.name for member in tf
+                if member.isreg() and _is_audio(member.name, extensions)]
+
+
+def _zip_data_offset(fileobj, info):
+    """读取ZIP本地文件头，计算成员数据的起始偏移"""
+    fileobj.seek(info.header_offset)
+    header = fileobj.read(30)
+    if header[:4] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"本地文件头损坏: {info.filename}")
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    return info.header_offset + 30 + name_len + extra_len
+
+
+def _iter_zip(archive_path, wanted):
+    """逐个打开ZIP中的成员：存储成员直接定位，压缩成员流式解压"""
+    with open(archive_path, 'rb') as raw, zipfile.ZipFile(raw) as zf:
+        if wanted is None:
+            infos = zf.infolist()
+        else:
+            infos = [zf.NameToInfo[name] for name in wanted if name in zf.NameToInfo]
+        for info in infos:
+            if info.is_dir() or (wanted is None and not _is_audio(info.filename)):
+                continue
+            if info.flag_bits & 0x1:
+                yield info.filename, None, '加密的ZIP成员'
+            elif info.compress_type == zipfile.ZIP_STORED:
+                start = _zip_data_offset(raw, info)
+                yield info.filename, RangeReader(raw, start, info.file_size, info.filename), None
+            else:
+                opener = lambda info=info: zf.open(info)
+                yield info.filename, StreamMemberReader(
+                    opener(), info.file_size, info.filename, opener=opener), None
+
+
+def _iter_tar(archive_path, wanted):
+    """逐个打开TAR中的成员：未压缩tar直接定位，压缩tar按流模式顺序解压"""
+    wanted = None if wanted is None else set(wanted)
+    if archive_path.lower().endswith('.tar'):
+        with open(archive_path, 'rb') as raw, tarfile.open(fileobj=raw, mode='r:') as tf:
+            for member in tf:
+                if not member.isreg() or not _is_audio(member.name):
+                    continue
+                if wanted is not None and member.name not in wanted:
+                    continue
+                if member.issparse():
+                    reader = StreamMemberReader(tf.extractfile(member), member.size, member.name)
+                else:
+                    reader = RangeReader(raw, member.offset_data, member.size, member.name)
+                yield member.name, reader, None
+        return
+
+    with tarfile.open(archive_path, 'r|*') as tf:
+        for member in tf:
+            if not member.isreg() or not _is_audio(member.name):
+                continue
+            if wanted is not None and member.name not in wanted:
+                continue
+            yield member.name, StreamMemberReader(
+                tf.extractfile(member), member.size, member.name), None
+
+
+def iter_archive_metadata(archive_path, entry=None, members=None):
+    """
+    直接解析归档中的音频成员，逐条产出 (条目路径 'archive!member', 元数据, 错误信息)
+    成员数据只按解析器需要的区间读取或解压，不写任何临时文件
+    """
+    archive_path = str(archive_path)
+    entry = entry or archive_path
+    iterate = _iter_zip if archive_path.lower().endswith('.zip') else _iter_tar
+
+    pending = None if members is None else set(members)
+    try:
+        for name, reader, error in iterate(archive_path, members):
+            if pending is not None:
+                pending.discard(name)
+            member_entry = f"{entry}{ARCHIVE_SEPARATOR}{name}"
+            if reader is None:
+                yield member_entry, None, error
+                continue
+            extractor = MusicMetadataExtractor.from_buffer(reader, name=name)
+            metadata, error = extract_quiet(extractor)
+            yield member_entry, metadata, error
+    except Exception as e:
+        error = f"归档读取失败: {e}"
+        if pending is None:
+            # 未指定成员（如extract整个归档）时，把归档本身记为失败
+            yield entry, None, error
+            return
+    else:
+        error = '归档中不存在该成员'
+    
+    # 清单中列出但未能读到的成员
+    for name in sorted(pending or ()):
+        yield f"{entry}{ARCHIVE_SEPARATOR}{name}", None, error
+
+
+def scan_archive(archive_path, entry=None, members=None):
+    """直接解析归档中的音频成员，逐条产出记录（路径为 'archive!member'）"""
+    for member_entry, metadata, error in iter_archive_metadata(archive_path, entry, members):
+        if metadata is None:
+            yield {'path': member_entry, 'error': error}
+        else:
+            yield metadata_to_record(metadata, member_entry)
+
+
+def _dump_record(record):
+    """记录序列化为一行JSON（键排序，保证输出稳定）"""
+    return json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n"
+
+
+# 外部排序时每个内存块的大小上限（字节），超出后分块排序再归并
+SORT_CHUNK = 8 * 1024 * 1024
+
+
+def _line_path(line):
+    return json.loads(line)['path']
+
+
+def _entry_key(line):
+    return line.rstrip(b'\n')
+
+
+def _sorted_chunk(f, key, chunk_size):
+    """读取约占 chunk_size 字节内存的行，按 key 稳定排序后返回"""
+    chunk = []
+    size = 0
+    for line in f:
+        chunk.append(line)
+        # 行对象本身加上排序键，短行的对象开销远大于内容
+        size += 2 * sys.getsizeof(line)
+        if size >= chunk_size:
+            break
+    chunk.sort(key=key)
+    return chunk
+
+
+def _external_sort(src, dst, key, tmp_dir, chunk_size=SORT_CHUNK):
+    """
+    按 key 对二进制文件 src 的各行做外部排序并写入 dst：排好序的块写入 tmp_dir 下的临时文件，
+    最后用 heapq 多路归并，内存中只保留一个块；key 相同的行保持原顺序
+    """
+    with contextlib.ExitStack() as stack:
+        runs = []
+        while True:
+            chunk = _sorted_chunk(src, key, chunk_size)
+            if not src.peek(1):
+                break  # 最后一块直接在内存中参与归并
+            run = stack.enter_context(tempfile.TemporaryFile(dir=tmp_dir))
+            run.writelines(chunk)
+            run.seek(0)
+            runs.append(run)
+            del chunk  # 读下一块之前释放
+        dst.writelines(heapq.merge(*runs, chunk, key=key) if runs else chunk)
+
+
+def _sort_partial(src_path, dst_path, chunk_size=SORT_CHUNK):
+    """按path对分片输出做外部排序（临时块写在输出目录）"""
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        _external_sort(src, dst, _line_path, Path(dst_path).parent, chunk_size)
+
+
+# ==================== I/O调度（访问顺序 / 预读） ====================
+
+def _entry_file(base, entry):
+    """条目对应的磁盘文件（归档成员对应归档文件本身）"""
+    archive, member = split_archive_entry(entry)
+    if member is not None and not (base / entry).exists():
+        return base / archive
+    return base / entry
+
+
+def _stat_key(base, entry):
+    """(设备号, inode号)；无法stat的条目排在最后"""
+    try:
+        st = os.stat(_entry_file(base, entry))
+        return (st.st_dev, st.st_ino)
+    except OSError:
+        return (float('inf'), float('inf'))
+
+
+# Linux FIEMAP ioctl：查询文件第一个数据块的物理偏移
+FS_IOC_FIEMAP = 0xC020660B
+
+
+def _physical_offset(path):
+    """返回文件首个extent的物理偏移，不支持时返回None"""
+    import fcntl
+
+    # struct fiemap 头（32字节）+ 1个 struct fiemap_extent（56字节）
+    buffer = bytearray(struct.pack('=QQLLLL', 0, 2 ** 64 - 1, 0, 0, 1, 0) + b'\0' * 56)
+    try:
+        with open(path, 'rb') as f:
+            fcntl.ioctl(f.fileno(), FS_IOC_FIEMAP, buffer)
+    except OSError:
+        return None
+    mapped, = struct.unpack_from('=L', buffer, 20)
+    if not mapped:
+        return None
+    physical, = struct.unpack_from('=Q', buffer, 40)
+    return physical
+
+
+def schedule_manifest(base, entries):
+    """清单原始顺序（不调整）"""
+    return list(entries)
+
+
+def schedule_directory(base, entries):
+    """按目录分组，目录内按文件名排序，同一归档的成员保持相邻"""
+    def key(entry):
+        path = _entry_file(base, entry)
+        return (str(path.parent), path.name, entry)
+    return sorted(entries, key=key)
+
+
+def schedule_inode(base, entries):
+    """按 (设备, inode) 排序；ext4/xfs 上inode顺序与数据在盘上的位置大体一致"""
+    return sorted(entries, key=lambda entry: (_stat_key(base, entry), entry))
+
+
+def schedule_extent(base, entries):
+    """按数据块的物理偏移排序（Linux FIEMAP），不支持时退回inode顺序"""
+    if not sys.platform.startswith('linux'):
+        return schedule_inode(base, entries)
+
+    offsets = {}
+
+    def key(entry):
+        path = _entry_file(base, entry)
+        if path not in offsets:
+            offsets[path] = _physical_offset(path)
+        device, inode = _stat_key(base, entry)
+        physical = offsets[path]
+        if physical is None:
+            return (device, 1, inode, entry)
+        return (device, 0, physical, entry)
+    return sorted(entries, key=key)
+
+
+# 可选的调度策略：名称 -> 排序函数 (base, entries) -> list
+SCHEDULERS = {
+    'manifest': schedule_manifest,
+    'directory': schedule_directory,
+    'inode': schedule_inode,
+    'extent': schedule_extent,
+}
+
+DEFAULT_SCHEDULER = 'directory'
+# 调度窗口：每次只对这么多个条目排序，内存占用与清单长度无关
+SCHEDULE_WINDOW = 10000
+
+
+def schedule_windows(base, items, scheduler=DEFAULT_SCHEDULER, window=SCHEDULE_WINDOW):
+    """
+    分窗口调度：items 为 (序号, 条目) 的迭代器，每攒满 window 个条目按调度策略排序后产出
+    同一归档的成员不会被拆到两个窗口，保证归档仍只被顺序读取一次
+    """
+    order = SCHEDULERS[scheduler]
+    batch = []
+    last_key = None
+    for seq, entry in items:
+        key, _ = split_archive_entry(entry)
+        if len(batch) >= window and key != last_key:
+            yield from _schedule_batch(base, batch, order)
+            batch = []
+        batch.append((seq, entry))
+        last_key = key
+    yield from _schedule_batch(base, batch, order)
+
+
+def _schedule_batch(base, batch, order):
+    """对一个窗口排序，产出 (序号, 条目)；重复的条目按原顺序分配序号"""
+    seqs = {}
+    for seq, entry in reversed(batch):
+        seqs.setdefault(entry, []).append(seq)
+    for entry in order(base, [entry for _, entry in batch]):
+        yield seqs[entry].pop(), entry
+
+# 预读的区域：文件头部（ID3v2/FLAC/Ogg标签）和尾部（ID3v1/APEv2）
+PREFETCH_HEAD = 512 * 1024
+PREFETCH_TAIL = 128 * 1024
+# 预读线程最多领先解析多少个条目
+PREFETCH_WINDOW = 32
+
+
+def prefetch_file(path, head=PREFETCH_HEAD, tail=PREFETCH_TAIL):
+    """提示内核异步预读标签所在区域；小文件的头尾合并为一次整体预读"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        size = os.fstat(fd).st_size
+        if size <= head + tail:
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+        else:
+            os.posix_fadvise(fd, 0, head, os.POSIX_FADV_WILLNEED)
+            os.posix_fadvise(fd, size - tail, tail, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ==================== 流式扫描流水线 ====================
+
+# 默认内存预算：在途（已解析未导出）结果的封面和歌词总大小上限
+MEMORY_BUDGET = 256 * 1024 * 1024
+# 阶段之间的默认队列长度
+QUEUE_SIZE = 64
+# 每条结果除封面和歌词外的估算开销
+ITEM_OVERHEAD = 2048
+# 写指标快照的间隔（秒）
+METRICS_SECONDS = 5.0
+
+
+def _iter_units(base, items):
+    """
+    把 (序号, 条目) 分组为解析单元：('file', entry, seq) 或 ('archive', archive, {member: seq})；
+    相邻的同一归档成员合并
+    """
+    archive = None
+    members = {}
+    for seq, entry in items:
+        name, member = split_archive_entry(entry)
+        if member is not None and (base / entry).exists():
+            member = None
+        
+        if archive is not None and (member is None or name != archive):
+            yield ('archive', archive, members)
+            archive, members = None, {}
+        
+        if member is None:
+            yield ('file', entry, seq)
+        else:
+            archive = name
+            members[member] = seq
+    
+    if archive is not None:
+        yield ('archive', archive, members)
+
+
+def _unit_path(base, unit):
+    """解析单元对应的磁盘文件"""
+    return base / unit[1]
+
+
+def _parse_unit(base, unit):
+    """解析一个单元，逐条产出 (序号, 条目, 元数据, 错误信息)"""
+    if unit[0] == 'file':
+        metadata, error = extract_quiet(base / unit[1])
+        yield unit[2], unit[1], metadata, error
+    else:
+        archive, members = unit[1], unit[2]
+        prefix = len(archive) + len(ARCHIVE_SEPARATOR)
+        for entry, metadata, error in iter_archive_metadata(base / archive, archive, list(members)):
+            yield members[entry[prefix:]], entry, metadata, error
+
+
+def _metadata_size(metadata):
+    """估算一条解析结果占用的内存（封面字节 + 歌词字符串 + 固定开销）"""
+    if metadata is None:
+        return ITEM_OVERHEAD
+    cover = _cover_bytes(metadata.get('cover'))
+    lyrics = metadata.get('lyrics')
+    return ITEM_OVERHEAD + (len(cover) if cover else 0) + (sys.getsizeof(lyrics) if lyrics else 0)
+
+
+class _Aborted(Exception):
+    """流水线已停止"""
+
+
+class MemoryBudget:
+    """在途数据的内存预算；超出时申请方阻塞，直到下游释放（背压）"""
+    
+    def __init__(self, limit, stop):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self.blocked_seconds = 0.0
+        self._stop = stop
+        self._cond = threading.Condition()
+    
+    def acquire(self, size):
+        """申请size字节；预算为空时总是放行，避免单条超大结果造成死锁"""
+        with self._cond:
+            start = None
+            while self.used and self.used + size > self.limit:
+                if self._stop.is_set():
+                    raise _Aborted()
+                start = start or time.monotonic()
+                self._cond.wait(0.1)
+            if start is not None:
+                self.blocked_seconds += time.monotonic() - start
+            self.used += size
+            self.peak = max(self.peak, self.used)
+    
+    def release(self, size):
+        with self._cond:
+            self.used -= size
+            self._cond.notify_all()
+
+
+class ScanPipeline:
+    """
+    批量扫描流水线：discover → read → parse → transform → export
+    各阶段之间用有界队列连接，解析结果计入内存预算，预算或队列满时上游阻塞（背压），
+    因此在途数据量与扫描的文件总数无关。export 阶段即迭代本对象的调用方线程：
+    
+        for seq, entry, record, metadata in ScanPipeline(base, units):
+            ...
+    
+    seq 为条目在解析单元中携带的序号（见 _iter_units）
+    metadata 只在 keep_metadata 为真时保留（供导出封面/歌词），否则在 transform 阶段丢弃
+    """
+    
+    # 各阶段的输入队列
+    QUEUES = ('read', 'parse', 'transform', 'export')
+    
+    def __init__(self, base, units, workers=1, prefetch=PREFETCH_WINDOW,
+                 queue_size=QUEUE_SIZE, memory_budget=MEMORY_BUDGET, keep_metadata=False):
+        self.base = base
+        self.units = units
+        self.workers = max(workers, 1)
+        self.prefetch = prefetch
+        self.keep_metadata = keep_metadata
+        
+        self._stop = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+        self.budget = MemoryBudget(memory_budget, self._stop)
+        
+        sizes = {'read': queue_size, 'parse': max(prefetch, 1),
+                 'transform': queue_size, 'export': queue_size}
+        self._queues = {name: queue.Queue(sizes[name]) for name in self.QUEUES}
+        self._max_depth = dict.fromkeys(self.QUEUES, 0)
+        self._blocked = dict.fromkeys(self.QUEUES, 0.0)
+        self._items = dict.fromkeys(self.QUEUES, 0)
+        self._threads = []
+    
+    # ---------- 队列操作 ----------
+    
+    def _put(self, name, item):
+        """放入队列；队列满时阻塞并累计被阻塞的时间"""
+        q = self._queues[name]
+        start = None
+        while True:
+            if self._stop.is_set():
+                raise _Aborted()
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                start = start or time.monotonic()
+        
+        with self._lock:
+            if start is not None:
+                self._blocked[name] += time.monotonic() - start
+            if item is not None:
+                self._items[name] += 1
+            self._max_depth[name] = max(self._max_depth[name], q.qsize())
+    
+    def _get(self, name):
+        q = self._queues[name]
+        while True:
+            if self._stop.is_set():
+                raise _Aborted()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+    
+    # ---------- 各阶段 ----------
+    
+    def _discover(self):
+        for unit in self.units:
+            self._put('read', unit)
+        self._put('read', None)
+    
+    def _read(self):
+        """发出预读提示；parse 队列的长度就是预读窗口"""
+        last = None
+        while True:
+            unit = self._get('read')
+            if unit is None:
+                break
+            path = _unit_path(self.base, unit)
+            if self.prefetch > 0 and path != last:
+                prefetch_file(path)
+                last = path
+            self._put('parse', unit)
+        for _ in range(self.workers):
+            self._put('parse', None)
+    
+    def _parse(self):
+        while True:
+            unit = self._get('parse')
+            if unit is None:
+                break
+            for seq, entry, metadata, error in _parse_unit(self.base, unit):
+                size = _metadata_size(metadata)
+                self.budget.acquire(size)
+                self._put('transform', (seq, entry, metadata, error, size))
+        self._put('transform', None)
+    
+    def _transform(self):
+        finished = 0
+        while finished < self.workers:
+            item = self._get('transform')
+            if item is None:
+                finished += 1
+                continue
+            seq, entry, metadata, error, size = item
+            if metadata is None:
+                record = {'path': entry, 'error': error}
+            else:
+                record = metadata_to_record(metadata, entry)
+            if not self.keep_metadata and metadata is not None:
+                # 封面原始数据不再需要，提前归还这部分预算
+                kept = ITEM_OVERHEAD + (sys.getsizeof(record['lyrics']) if record.get('lyrics') else 0)
+                self.budget.release(size - kept)
+                metadata, size = None, kept
+            self._put('export', (seq, entry, record, metadata, size))
+        self._put('export', None)
+    
+    def _run(self, stage):
+        try:
+            stage()
+        except _Aborted:
+            pass
+        except BaseException as e:
+            self._error = e
+            self._stop.set()
+    
+    def start(self):
+        stages = [('discover', self._discover), ('read', self._read)]
+        stages += [(f'parse-{i}', self._parse) for i in range(self.workers)]
+        stages += [('transform', self._transform)]
+        for name, stage in stages:
+            thread = threading.Thread(target=self._run, args=(stage,), name=f'smpe-{name}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def __iter__(self):
+        if not self._threads:
+            self.start()
+        try:
+            while True:
+                try:
+                    item = self._get('export')
+                except _Aborted:
+                    break
+                if item is None:
+                    break
+                seq, entry, record, metadata, size = item
+                yield seq, entry, record, metadata
+                self.budget.release(size)
+        finally:
+            self.close()
+        if self._error is not None:
+            raise self._error
+    
+    def close(self):
+        """停止所有阶段并等待线程退出"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+    
+    def metrics(self):
+        """各阶段队列深度、吞吐、背压阻塞时间和内存预算使用情况"""
+        with self._lock:
+            queues = {
+                name: {
+                    'depth': self._queues[name].qsize(),
+                    'max_depth': self._max_depth[name],
+                    'capacity': self._queues[name].maxsize,
+                    'items': self._items[name],
+                    'blocked_seconds': round(self._blocked[name], 3),
+                }
+                for name in self.QUEUES
+            }
+        return {
+            'queues': queues,
+            'memory': {'used': self.budget.used, 'peak': self.budget.peak,
+                       'budget': self.budget.limit,
+                       'blocked_seconds': round(self.budget.blocked_seconds, 3)},
+        }
+
+
+# 默认每处理多少条记录或多少秒写一次检查点
+CHECKPOINT_EVERY = 1000
+CHECKPOINT_SECONDS = 10.0
+
+
+class DoneSet:
+    """
+    已完成条目的序号集合：只保存水位线（其下的序号全部完成）和水位线之上零散完成的序号
+    按窗口调度时乱序范围不超过一个调度窗口加流水线深度，因此占用的内存与清单长度无关
+    """
+    
+    def __init__(self):
+        self.watermark = 0
+        self._above = set()
+    
+    def add(self, seq):
+        if seq >= self.watermark:
+            self._above.add(seq)
+        while self.watermark in self._above:
+            self._above.remove(self.watermark)
+            self.watermark += 1
+    
+    def __contains__(self, seq):
+        return seq < self.watermark or seq in self._above
+    
+    def __len__(self):
+        return self.watermark + len(self._above)
+
+
+class ScanJournal:
+    """
+    批量扫描的检查点日志（JSON Lines）
+    每个检查点先把输出刷新到磁盘，再追加一行 {"offset": 输出字节数, "done": [本批完成的条目序号]}；
+    序号是条目在本分片清单条目中的位置，因此恢复时必须使用同一份清单；
+    offset 是最后一条登记完成的记录之后的位置（而不是当前写到的位置），
+    恢复时截断输出到最后一个检查点的偏移，之后写出的记录会重新生成，因此不会重复
+    """
+    
+    def __init__(self, path, every=CHECKPOINT_EVERY, seconds=CHECKPOINT_SECONDS):
+        self.path = Path(path)
+        self.every = every
+        self.seconds = seconds
+        self._pending = []
+        self._offset = 0
+        self._out = None
+        self._file = None
+        self._last = 0.0
+    
+    def load(self):
+        """读取已有日志，返回 (最后检查点的输出偏移, 已完成序号的 DoneSet)"""
+        offset = 0
+        done = DoneSet()
+        if not self.path.exists():
+            return offset, done
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    checkpoint = json.loads(line)
+                except ValueError:
+                    break  # 写到一半的最后一行
+                offset = checkpoint['offset']
+                for seq in checkpoint['done']:
+                    done.add(seq)
+        return offset, done
+    
+    def start(self, out, resume=False):
+        """开始记录（out 为二进制模式打开的输出文件）"""
+        self._out = out
+        self._offset = out.tell()
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._last = time.monotonic()
+    
+    def add(self, seq, offset):
+        """
+        登记一条已完成的记录：seq 为条目序号，offset 为该记录之后的输出位置
+        记录写出后、登记之前被中断时，检查点不包含这条记录，恢复时会截掉它并重新解析
+        """
+        self._pending.append(seq)
+        self._offset = offset
+        if len(self._pending) >= self.every or time.monotonic() - self._last >= self.seconds:
+            self.checkpoint()
+    
+    def checkpoint(self):
+        """刷新输出并追加一个检查点"""
+        if self._file is None or not self._pending:
+            return
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        self._file.write(json.dumps({'offset': self._offset, 'done': self._pending},
+                                    ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = []
+        self._last = time.monotonic()
+    
+    def close(self):
+        """写出最后的检查点并关闭日志"""
+        if self._file is not None:
+            self.checkpoint()
+            self._file.close()
+            self._file = None
+    
+    def remove(self):
+        """任务完成后删除日志"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+
+def _export_entry_dir(export_dir, entry):
+    """导出目录按条目的相对路径分层，避免不同目录下同名文件互相覆盖"""
+    archive, member = split_archive_entry(entry)
+    if member is None:
+        return Path(export_dir, entry).parent
+    return Path(export_dir, archive, member).parent
+
+
+def scan_shard(manifest_path, shard_index, num_shards, output_dir, root=None,
+               resume=False, checkpoint_every=CHECKPOINT_EVERY,
+               scheduler=DEFAULT_SCHEDULER, prefetch=PREFETCH_WINDOW,
+               workers=1, memory_budget=MEMORY_BUDGET, export_dir=None, metrics_path=None,
+               schedule_window=SCHEDULE_WINDOW):
+    """
+    扫描清单中属于指定分片的文件
+    结果追加写入未排序文件并定期记录检查点；完成后按path排序并原子地重命名为最终分片文件
+    resume 为真时跳过检查点中已完成的条目，接着已有输出继续写
+    scheduler 决定访问顺序（见 SCHEDULERS），每 schedule_window 个条目排序一次；prefetch 为预读窗口大小（0 关闭预读）
+    清单逐行读取、已完成条目只保存水位线，内存占用与清单长度无关
+    解析通过 ScanPipeline 进行：workers 个解析线程，在途结果受 memory_budget 字节限制；
+    export_dir 非空时同时用 MetadataSaver 导出文本、歌词和封面；metrics_path 非空时定期追加指标快照
+    """
+    manifest_root, entries = read_manifest(manifest_path)
+    base = Path(root or manifest_root or '.')
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    final_path = output_dir / shard_file_name(shard_index, num_shards)
+    tmp_path = final_path.with_name(final_path.name + '.tmp')
+    unsorted_path = final_path.with_name(final_path.name + '.unsorted')
+    journal = ScanJournal(final_path.with_name(final_path.name + '.journal'), every=checkpoint_every)
+
+    if resume and final_path.exists():
+        print(f"✅ 分片 {shard_index}/{num_shards} 已完成，跳过 -> {final_path}")
+        return final_path
+
+    done = DoneSet()
+    if resume:
+        offset, done = journal.load()
+        size = unsorted_path.stat().st_size if unsorted_path.exists() else 0
+        if size < offset:
+            print(f"⚠️  输出文件短于检查点记录，分片 {shard_index} 从头开始")
+            resume, done = False, DoneSet()
+        else:
+            # 丢弃最后一个检查点之后写出的记录，它们会被重新解析
+            with open(unsorted_path, 'ab') as f:
+                f.truncate(offset)
+            if done:
+                print(f"🔄 分片 {shard_index}/{num_shards}: 从检查点恢复，已完成 {len(done)} 个")
+
+    # 序号为条目在本分片中的位置，与调度顺序无关
+    shard_entries = (e for e in entries if shard_of(e, num_shards) == shard_index)
+    todo = ((seq, e) for seq, e in enumerate(shard_entries) if seq not in done)
+    units = _iter_units(base, schedule_windows(base, todo, scheduler, schedule_window))
+    pipeline = ScanPipeline(base, units, workers=workers, prefetch=prefetch,
+                            memory_budget=memory_budget, keep_metadata=export_dir is not None)
+    metrics_file = open(metrics_path, 'a', encoding='utf-8') if metrics_path else None
+
+    def write_metrics():
+        if metrics_file is not None:
+            snapshot = dict(pipeline.metrics(), shard=shard_index, exported=count)
+            metrics_file.write(json.dumps(snapshot) + "\n")
+            metrics_file.flush()
+
+    count = 0
+    failed = 0
+    last_metrics = time.monotonic()
+    with open(unsorted_path, 'ab' if resume else 'wb') as out:
+        journal.start(out, resume)
+        try:
+            position = out.tell()
+            for seq, entry, record, metadata in pipeline:
+                if 'error' in record:
+                    failed += 1
+                position += out.write(_dump_record(record).encode('utf-8'))
+                if metadata is not None:
+                    MetadataSaver.save_all(metadata, _export_entry_dir(export_dir, entry), verbose=False)
+                # 导出完成后才登记，中途被中断的记录不计入检查点
+                journal.add(seq, position)
+                count += 1
+                if metrics_file is not None and time.monotonic() - last_metrics >= METRICS_SECONDS:
+                    write_metrics()
+                    last_metrics = time.monotonic()
+        finally:
+            journal.close()
+            write_metrics()
+            if metrics_file is not None:
+                metrics_file.close()
+
+    _sort_partial(unsorted_path, tmp_path)
+    os.replace(tmp_path, final_path)
+    os.remove(unsorted_path)
+    journal.remove()
+
+    print(f"✅ 分片 {shard_index}/{num_shards}: {count} 个文件, 失败 {failed} 个 -> {final_path}")
+    stats = pipeline.metrics()
+    depths = ', '.join(f"{name} {q['max_depth']}/{q['capacity']}" for name, q in stats['queues'].items())
+    print(f"   📊 队列峰值: {depths} | 内存峰值 {stats['memory']['peak'] / 1048576:.1f} MB"
+          f" / 预算 {stats['memory']['budget'] / 1048576:.0f} MB")
+    return final_path
+
+
+# 本机多分片时由子进程执行的命令行脚本
+CLI_SCRIPT = str(Path(__file__).resolve().with_name('music_metadata_mp3_fixed.py'))
+
+
+def run_local_shards(manifest_path, num_shards, output_dir, root=None, resume=False,
+                     checkpoint_every=CHECKPOINT_EVERY, scheduler=DEFAULT_SCHEDULER,
+                     prefetch=PREFETCH_WINDOW, extra_args=()):
+    """在本机以独立进程运行全部分片（用于单机测试多节点扫描）"""
+    procs = []
+    for shard_index in range(num_shards):
+        cmd = [
+            sys.executable, CLI_SCRIPT, 'scan',
+            '--manifest', str(manifest_path),
+            '--shard', str(shard_index),
+            '--num-shards', str(num_shards),
+            '--output-dir', str(output_dir),
+        ]
+        if root:
+            cmd += ['--root', str(root)]
+        if resume:
+            cmd.append('--resume')
+        cmd += ['--checkpoint-every', str(checkpoint_every),
+                '--scheduler', scheduler, '--prefetch', str(prefetch)]
+        cmd += list(extra_args)
+        procs.append(subprocess.Popen(cmd))
+
+    try:
+        return [proc.wait() for proc in procs]
+    except KeyboardInterrupt:
+        # Ctrl-C 同时发给了子进程，等它们写完检查点再退出
+        for proc in procs:
+            proc.wait()
+        raise
+
+
+def _iter_partial(path):
+    """逐行读取分片输出"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _preferred_record(records):
+    """重复记录中确定性地选出一条：成功优先，其次按规范化JSON排序"""
+    return min(records, key=lambda r: ('error' in r, _dump_record(r)))
+
+
+def merge_shards(output_dir, merged_path):
+    """
+    合并所有分片输出为一个数据集
+    各分片已按path排序，这里做流式多路归并并按path去重
+    """
+    output_dir = Path(output_dir)
+    parts = sorted(output_dir.glob('part-*-of-*.jsonl'))
+    if not parts:
+        print(f"❌ 未找到分片输出: {output_dir}")
+        return None
+
+    expected = {p.name.split('-of-')[1] for p in parts}
+    if len(expected) > 1:
+        print(f"⚠️  发现不同分片数的输出: {', '.join(sorted(expected))}")
+    else:
+        num_shards = int(expected.pop().split('.')[0])
+        missing = [i for i in range(num_shards)
+                   if not (output_dir / shard_file_name(i, num_shards)).exists()]
+        if missing:
+            print(f"⚠️  缺少分片: {missing}")
+
+    streams = [_iter_partial(p) for p in parts]
+    merged = heapq.merge(*streams, key=lambda r: r['path'])
+
+    written = 0
+    duplicates = 0
+    tmp_path = Path(str(merged_path) + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        group = []
+        for record in merged:
+            if group and record['path'] != group[0]['path']:
+                out.write(_dump_record(_preferred_record(group)))
+                written += 1
+                duplicates += len(group) - 1
+                group = []
+            group.append(record)
+        if group:
+            out.write(_dump_record(_preferred_record(group)))
+            written += 1
+            duplicates += len(group) - 1
+    os.replace(tmp_path, merged_path)
+
+    print(f"✅ 合并完成: {len(parts)} 个分片, {written} 条记录, 去重 {duplicates} 条 -> {merged_path}")
+    return Path(merged_path)
+
+
+# ==================== 命令行子命令 ====================
+
+def add_batch_commands(sub):
+    """向命令行注册 manifest / scan / merge 子命令"""
+    p_manifest = sub.add_parser('manifest', help=BATCH_COMMANDS['manifest'])
+    p_manifest.add_argument('root', help='音乐库根目录')
+    p_manifest.add_argument('-o', '--output', required=True, help='清单文件路径')
+
+    p_scan = sub.add_parser('scan', help=BATCH_COMMANDS['scan'])
+    p_scan.add_argument('--manifest', required=True, help='清单文件路径')
+    p_scan.add_argument('--num-shards', type=int, default=1, help='分片总数')
+    p_scan.add_argument('--shard', type=int, help='本进程处理的分片编号（从0开始）')
+    p_scan.add_argument('--local', action='store_true', help='在本机以独立进程运行全部分片')
+    p_scan.add_argument('--output-dir', required=True, help='分片输出目录（可为共享目录）')
+    p_scan.add_argument('--root', help='覆盖清单中记录的根目录')
+    p_scan.add_argument('--merge', metavar='FILE', help='全部分片完成后合并到FILE（需配合--local）')
+    p_scan.add_argument('--resume', action='store_true', help='从检查点继续上次中断的扫描')
+    p_scan.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help=f'每处理多少个文件写一次检查点（默认 {CHECKPOINT_EVERY}）')
+    p_scan.add_argument('--scheduler', choices=sorted(SCHEDULERS), default=DEFAULT_SCHEDULER,
+                        help='文件访问顺序：manifest=清单顺序, directory=按目录, '
+                             'inode=按inode, extent=按磁盘物理位置（默认 %(default)s）')
+    p_scan.add_argument('--schedule-window', type=int, default=SCHEDULE_WINDOW,
+                        help='每次按调度策略排序的条目数（默认 %(default)s）')
+    p_scan.add_argument('--prefetch', type=int, default=PREFETCH_WINDOW,
+                        help='预读窗口：提前对多少个文件的标签区域发出预读提示，0为关闭（默认 %(default)s）')
+    p_scan.add_argument('--workers', type=int, default=1, help='解析线程数（默认 %(default)s）')
+    p_scan.add_argument('--memory-budget', type=int, default=MEMORY_BUDGET // 1048576, metavar='MB',
+                        help='在途解析结果（封面、歌词）的内存上限，单位MB（默认 %(default)s）')
+    p_scan.add_argument('--export-dir', help='同时导出文本、歌词和封面到该目录（按相对路径分层）')
+    p_scan.add_argument('--metrics', metavar='FILE',
+                        help=f'每 {METRICS_SECONDS:.0f} 秒追加一行JSON格式的队列深度/内存指标')
+
+    p_merge = sub.add_parser('merge', help=BATCH_COMMANDS['merge'])
+    p_merge.add_argument('--output-dir', required=True, help='分片输出目录')
+    p_merge.add_argument('-o', '--output', required=True, help='合并后的数据集路径')
+
+
+def shard_summary(path, shard_index, num_shards):
+    """统计分片输出的记录数和失败数，返回 scan 子命令输出的JSON摘要"""
+    files = 0
+    failed = 0
+    for record in _iter_partial(path):
+        files += 1
+        failed += 'error' in record
+    return {'shard': shard_index, 'num_shards': num_shards, 'output': str(path),
+            'files': files, 'failed': failed}
+
+
+def run_batch_command(parser, args, emit):
+    """
+    执行 manifest / scan / merge 子命令
+    scan 每完成一个分片调用 emit 向标准输出写一行JSON摘要（--local 时由各分片子进程输出）
+    """
+    if args.command == 'manifest':
+        count = build_manifest(args.root, args.output)
+        print(f"✅ 清单已生成: {count} 个文件 -> {args.output}")
+        return 0
+
+    if args.command == 'scan':
+        if args.num_shards < 1:
+            parser.error('--num-shards 必须大于0')
+        if args.schedule_window < 1:
+            parser.error('--schedule-window 必须大于0')
+        if args.local:
+            try:
+                extra_args = ['--workers', str(args.workers),
+                              '--memory-budget', str(args.memory_budget),
+                              '--schedule-window', str(args.schedule_window)]
+                if args.export_dir:
+                    extra_args += ['--export-dir', args.export_dir]
+                if args.metrics:
+                    extra_args += ['--metrics', args.metrics]
+                codes = run_local_shards(args.manifest, args.num_shards, args.output_dir,
+                                         args.root, args.resume, args.checkpoint_every,
+                                         args.scheduler, args.prefetch, extra_args)
+            except KeyboardInterrupt:
+                print("\n\n👋 扫描已中断，检查点已保存；使用 --resume 继续")
+                return 130
+            if any(codes):
+                print(f"❌ 有分片失败: {[i for i, c in enumerate(codes) if c]}")
+                return 1
+            if args.merge:
+                merge_shards(args.output_dir, args.merge)
+            return 0
+        if args.shard is None:
+            parser.error('需要指定 --shard 或 --local')
+        if not 0 <= args.shard < args.num_shards:
+            parser.error('--shard 超出范围')
+        if args.merge:
+            parser.error('--merge 需要配合 --local 使用')
+        try:
+            path = scan_shard(args.manifest, args.shard, args.num_shards, args.output_dir, args.root,
+                              resume=args.resume, checkpoint_every=args.checkpoint_every,
+                              scheduler=args.scheduler, prefetch=args.prefetch,
+                              workers=args.workers, memory_budget=args.memory_budget * 1048576,
+                              export_dir=args.export_dir, metrics_path=args.metrics,
+                              schedule_window=args.schedule_window)
+        except KeyboardInterrupt:
+            print("\n\n👋 扫描已中断，检查点已保存；使用 --resume 继续")
+            emit({'shard': args.shard, 'num_shards': args.num_shards, 'error': '扫描已中断'})
+            return 130
+        emit(shard_summary(path, args.shard, args.num_shards))
+        return 0
+
+    if args.command == 'merge':
+        return 0 if merge_shards(args.output_dir, args.output) else 1
+
+    return 1
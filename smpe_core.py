@@ -0,0 +1,1323 @@
+"""
+音乐文件元数据解析工具 - MP3歌词强化版
+专门针对MP3文件的USLT/SYLT歌词帧进行解析
+
+本模块是解析器与命令行的实现，入口脚本为 music_metadata_mp3_fixed.py
+mutagen 的各格式模块在解析器内部按需导入，命令行单次提取只加载用到的格式
+"""
+
+import os
+import sys
+import io
+import errno
+import json
+import hashlib
+import contextlib
+from pathlib import Path
+
+# ==================== 标签字段表 ====================
+
+# 各标签体系在 TAG_SCHEMA 中对应的列
+TAG_FAMILIES = ('id3', 'vorbis', 'mp4')
+
+# 规范字段 -> (ID3帧, Vorbis注释键, MP4原子)；None 表示该体系没有对应字段
+# 新增字段只需在这里加一行，解析时按预编译的查找计划直接取值，不增加逐文件探测
+TAG_SCHEMA = {
+    'title':    ('TIT2', 'title', '©nam'),
+    'artist':   ('TPE1', 'artist', '©ART'),
+    'album':    ('TALB', 'album', '©alb'),
+    'track':    ('TRCK', 'tracknumber', 'trkn'),
+    'disc':     ('TPOS', 'discnumber', 'disk'),
+    'genre':    ('TCON', 'genre', '©gen'),
+    'year':     ('TDRC', 'date', '©day'),
+    'composer': ('TCOM', 'composer', '©wrt'),
+    'isrc':     ('TSRC', 'isrc', '----:com.apple.iTunes:ISRC'),
+    'replaygain_track_gain': ('TXXX:REPLAYGAIN_TRACK_GAIN', 'replaygain_track_gain',
+                              '----:com.apple.iTunes:replaygain_track_gain'),
+    'replaygain_track_peak': ('TXXX:REPLAYGAIN_TRACK_PEAK', 'replaygain_track_peak',
+                              '----:com.apple.iTunes:replaygain_track_peak'),
+    'replaygain_album_gain': ('TXXX:REPLAYGAIN_ALBUM_GAIN', 'replaygain_album_gain',
+                              '----:com.apple.iTunes:replaygain_album_gain'),
+    'replaygain_album_peak': ('TXXX:REPLAYGAIN_ALBUM_PEAK', 'replaygain_album_peak',
+                              '----:com.apple.iTunes:replaygain_album_peak'),
+    'musicbrainz_trackid':  ('UFID:http://musicbrainz.org', 'musicbrainz_trackid',
+                             '----:com.apple.iTunes:MusicBrainz Track Id'),
+    'musicbrainz_albumid':  ('TXXX:MusicBrainz Album Id', 'musicbrainz_albumid',
+                             '----:com.apple.iTunes:MusicBrainz Album Id'),
+    'musicbrainz_artistid': ('TXXX:MusicBrainz Artist Id', 'musicbrainz_artistid',
+                             '----:com.apple.iTunes:MusicBrainz Artist Id'),
+}
+
+# 只取 x/y 中 x 的字段
+NUMBER_FIELDS = ('track',)
+
+# 扩展字段的显示名称（仅在有值时显示）
+EXTENDED_FIELD_LABELS = (
+    ("🎸 流派", 'genre'),
+    ("📅 年份", 'year'),
+    ("✍️ 作曲", 'composer'),
+    ("🔖 ISRC", 'isrc'),
+    ("🔊 音轨增益", 'replaygain_track_gain'),
+    ("🔊 音轨峰值", 'replaygain_track_peak'),
+    ("🔊 专辑增益", 'replaygain_album_gain'),
+    ("🔊 专辑峰值", 'replaygain_album_peak'),
+    ("🆔 MB音轨ID", 'musicbrainz_trackid'),
+    ("🆔 MB专辑ID", 'musicbrainz_albumid'),
+    ("🆔 MB艺人ID", 'musicbrainz_artistid'),
+)
+
+
+def _first_text(value):
+    """取标签值的第一个文本（兼容ID3帧、列表、bytes和APE值）"""
+    if hasattr(value, 'text'):
+        value = value.text
+    if isinstance(value, list):
+        value = value[0]
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='ignore')
+    return str(value)
+
+
+def _id3_ufid(frame):
+    """UFID帧的标识符存放在data中"""
+    return frame.data.decode('ascii', errors='ignore')
+
+
+def _mp4_pair(value):
+    """MP4的trkn/disk为 (序号, 总数) 元组"""
+    number = value[0][0]
+    return str(number) if number else None
+
+
+def _number(convert):
+    """包装转换函数，处理 x/y 格式"""
+    def convert_number(value):
+        text = convert(value)
+        return text.split('/')[0] if text else text
+    return convert_number
+
+
+def _year(convert):
+    """包装转换函数，日期只保留年份"""
+    def convert_year(value):
+        text = convert(value)
+        return text[:4] if text else text
+    return convert_year
+
+
+def _field_converter(family, field, key):
+    """为 (标签体系, 字段) 选择取值函数"""
+    if family == 'id3' and key.startswith('UFID:'):
+        convert = _id3_ufid
+    elif family == 'mp4' and key in ('trkn', 'disk'):
+        return _mp4_pair
+    else:
+        convert = _first_text
+
+    if field in NUMBER_FIELDS:
+        return _number(convert)
+    if field == 'year':
+        return _year(convert)
+    return convert
+
+
+_FIELD_PLANS = {}
+
+
+def compile_field_plan(family):
+    """
+    将 TAG_SCHEMA 编译为某个标签体系的查找计划 ((字段, 键, 取值函数), ...)
+    每个体系只编译一次；未知体系（如APEv2）按Vorbis键名通用取值
+    """
+    plan = _FIELD_PLANS.get(family)
+    if plan is None:
+        column = TAG_FAMILIES.index(family) if family in TAG_FAMILIES else TAG_FAMILIES.index('vorbis')
+        entries = []
+        for field, keys in TAG_SCHEMA.items():
+            key = keys[column]
+            if key is None:
+                continue
+            if family == 'id3' and key.startswith('TXXX:'):
+                key = _id3_txxx_key(key)
+            if family in TAG_FAMILIES:
+                entries.append((field, key, _field_converter(family, field, key)))
+            else:
+                entries.append((field, key, _field_converter('vorbis', field, key)))
+        plan = tuple(entries)
+        _FIELD_PLANS[family] = plan
+    return plan
+
+
+_TAG_FAMILY_BY_TYPE = {}
+
+
+def tag_family(tags):
+    """根据标签对象的类型判断标签体系（按类型缓存）"""
+    tag_type = type(tags)
+    family = _TAG_FAMILY_BY_TYPE.get(tag_type)
+    if family is None:
+        names = {cls.__name__ for cls in tag_type.__mro__}
+        if 'ID3Tags' in names:
+            family = 'id3'
+        elif 'VComment' in names:
+            family = 'vorbis'
+        elif 'MP4Tags' in names:
+            family = 'mp4'
+        else:
+            family = 'generic'
+        _TAG_FAMILY_BY_TYPE[tag_type] = family
+    return family
+
+
+def _id3_txxx_key(key):
+    """TXXX帧按小写描述归一（各标签软件写入的描述大小写不统一）"""
+    return 'TXXX:' + key[5:].lower()
+
+
+def _id3_keys(tags):
+    """一次遍历ID3帧键，返回 查找键 -> 原始帧键（TXXX帧按小写描述归一）"""
+    keys = {}
+    for key in tags.keys():
+        keys.setdefault(_id3_txxx_key(key) if key.startswith('TXXX:') else key, key)
+    return keys
+
+
+def _vorbis_index(tags):
+    """一次遍历建立小写键索引（VCommentDict每次取值都要线性扫描全部注释）"""
+    index = {}
+    for key, value in tags:
+        index.setdefault(key.lower(), []).append(value)
+    return index
+
+
+# ==================== 内存数据源 ====================
+
+# 格式提示（扩展名或MIME类型） -> 解析器使用的扩展名
+FORMAT_HINTS = {
+    'mp3': '.mp3', 'audio/mpeg': '.mp3', 'audio/mp3': '.mp3',
+    'flac': '.flac', 'audio/flac': '.flac', 'audio/x-flac': '.flac',
+    'm4a': '.m4a', 'mp4': '.mp4', 'audio/mp4': '.m4a', 'audio/x-m4a': '.m4a',
+    # 裸AAC（ADTS）流不是MP4容器，交给通用解析器
+    'aac': '.aac', 'audio/aac': '.aac', 'audio/x-aac': '.aac',
+    'ogg': '.ogg', 'audio/ogg': '.ogg', 'audio/vorbis': '.ogg',
+    'opus': '.opus', 'audio/opus': '.opus',
+}
+
+
+def normalize_format_hint(hint):
+    """将 'mp3' / '.MP3' / 'audio/mpeg' 等格式提示统一为扩展名"""
+    hint = hint.strip().lower()
+    if hint in FORMAT_HINTS:
+        return FORMAT_HINTS[hint]
+    if hint.lstrip('.') in FORMAT_HINTS:
+        return FORMAT_HINTS[hint.lstrip('.')]
+    return hint if hint.startswith('.') else '.' + hint
+
+
+def sniff_format(header):
+    """根据文件头魔数猜测格式，无法识别时返回空字符串（走通用解析器）"""
+    header = bytes(header)
+    if header[:4] == b'fLaC':
+        return '.flac'
+    if header[:3] == b'ID3':
+        return '.mp3'
+    if header[:4] == b'OggS':
+        if b'OpusHead' in header:
+            return '.opus'
+        if b'\x01vorbis' in header:
+            return '.ogg'
+        return ''
+    if header[4:8] == b'ftyp':
+        return '.m4a'
+    # MPEG帧同步：layer 位为00的是ADTS（裸AAC），其余为MPEG音频
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        if header[1] & 0xF6 == 0xF0:
+            return '.aac'
+        if header[1] & 0x06:
+            return '.mp3'
+    return ''
+
+
+class BufferReader(io.RawIOBase):
+    """只读、可seek的内存缓冲区文件对象；通过memoryview按需切片，不复制整个缓冲区"""
+    
+    def __init__(self, data, name=''):
+        self._view = memoryview(data).cast('B')
+        self._pos = 0
+        self.name = name
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        end = min(self._pos + len(buffer), len(self._view))
+        size = max(end - self._pos, 0)
+        buffer[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"无效的whence: {whence}")
+        if pos < 0:
+            raise OSError(errno.EINVAL, "seek位置不能为负数")
+        self._pos = pos
+        return pos
+    
+    def tell(self):
+        return self._pos
+
+
+class MusicMetadataExtractor:
+    """音乐元数据提取器 - 强化MP3歌词解析"""
+    
+    def __init__(self, file_path, fileobj=None, format_hint=None):
+        self.file_path = Path(file_path)
+        self.fileobj = fileobj
+        # 提示信息的输出函数；批量解析时替换为收集函数，避免多线程下重定向标准输出
+        self.log = print
+        if format_hint:
+            self.extension = normalize_format_hint(format_hint)
+        else:
+            self.extension = self.file_path.suffix.lower()
+        self.metadata = dict.fromkeys(TAG_SCHEMA)
+        self.metadata.update({
+            'lyrics': None, 'cover': None, 'duration': None, 'format': None,
+            'file_name': self.file_path.name
+        })
+    
+    @classmethod
+    def from_buffer(cls, source, format_hint=None, name=None):
+        """
+        从内存数据创建提取器，无需先写入临时文件
+        source 可以是 bytes / bytearray / memoryview 或可seek的二进制文件对象；
+        内存数据通过只读视图访问，不会整体复制。未给出格式提示时根据文件头识别
+        """
+        name = str(name or getattr(source, 'name', None) or '<buffer>')
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            fileobj = BufferReader(source, name)
+        elif hasattr(source, 'read') and hasattr(source, 'seek'):
+            fileobj = source
+        else:
+            raise TypeError(f"不支持的数据源类型: {type(source).__name__}")
+        
+        if not format_hint and not Path(name).suffix:
+            fileobj.seek(0)
+            format_hint = sniff_format(fileobj.read(64))
+        
+        return cls(name, fileobj=fileobj, format_hint=format_hint)
+    
+    def _source(self):
+        """返回交给mutagen的文件来源（路径，或回到开头的文件对象）"""
+        if self.fileobj is None:
+            return self.file_path
+        self.fileobj.seek(0)
+        return self.fileobj
+    
+    def extract(self):
+        """主提取方法"""
+        if self.fileobj is None and not self.file_path.exists():
+            self.log(f"❌ 文件不存在: {self.file_path}")
+            return None
+        
+        self.log(f"\n🔍 解析文件: {self.file_path.name}")
+        self.log(f"📁 格式: {self.extension[1:].upper() or '自动识别'}")
+        
+        try:
+            # 根据格式调用相应的解析器
+            if self.extension == '.mp3':
+                return self._parse_mp3()
+            elif self.extension in ['.flac']:
+                return self._parse_flac()
+            elif self.extension in ['.m4a', '.mp4']:
+                return self._parse_m4a()
+            elif self.extension in ['.ogg']:
+                return self._parse_ogg()
+            elif self.extension in ['.opus']:
+                return self._parse_opus()
+            else:
+                # 通用解析器（用于其他格式）
+                return self._parse_generic()
+                
+        except Exception as e:
+            self.log(f"❌ 解析失败: {e}")
+            return None
+    
+    def _parse_mp3(self):
+        """专用MP3解析器 - 重点强化歌词提取"""
+        from mutagen.id3 import ID3, ID3NoHeaderError
+        from mutagen.mp3 import MP3
+        
+        try:
+            # 方法1：MP3对象加载时会同时读取ID3标签，一次加载取得标签和时长
+            # （不可重开的数据流如压缩tar成员，不需要回到开头再读一遍）
+            try:
+                audio = MP3(self._source())
+                id3 = audio.tags
+            except Exception as e:
+                # 找不到有效音频帧时仍尽量读取标签（没有时长）
+                self.log(f"⚠️  无法读取MP3音频信息: {e}")
+                audio = None
+                try:
+                    id3 = ID3(self._source())
+                except ID3NoHeaderError:
+                    id3 = None
+            if id3 is None:
+                self.log("⚠️  MP3文件没有ID3标签头，尝试通用解析")
+                return self._parse_generic()
+            
+            # 按字段表提取基本元数据
+            self._apply_field_plan(id3, 'id3')
+            self.metadata['format'] = 'MP3'
+            
+            # 提取封面
+            self._extract_mp3_cover(id3)
+            
+            # ★ 核心改进：使用专用函数提取MP3歌词
+            self.metadata['lyrics'] = self._extract_mp3_lyrics_dedicated(id3)
+            
+            # 获取时长
+            if audio is not None and hasattr(audio.info, 'length'):
+                self.metadata['duration'] = audio.info.length
+            
+            return self.metadata
+            
+        except Exception as e:
+            self.log(f"❌ MP3解析失败: {e}")
+            return None
+    
+    def _extract_mp3_lyrics_dedicated(self, id3_tags):
+        """
+        专用的MP3歌词提取函数
+        重点处理USLT和SYLT帧
+        """
+        if not id3_tags:
+            return None
+        
+        from mutagen.id3 import USLT, SYLT
+        
+        lyrics = None
+        
+        self.log("🎵 正在搜索MP3歌词帧...")
+        
+        # 方法1：优先查找USLT（无时间戳歌词）
+        try:
+            # getall('USLT') 返回所有USLT帧的列表
+            uslt_frames = id3_tags.getall('USLT')
+            if uslt_frames:
+                # 通常取第一个USLT帧
+                uslt = uslt_frames[0]
+                lyrics = uslt.text
+                
+                # 尝试不同编码解码
+                if isinstance(lyrics, bytes):
+                    lyrics = self._decode_lyrics_bytes(lyrics)
+                
+                self.log(f"   ✅ 从 [USLT] 帧找到歌词 ({len(lyrics)} 字符)")
+                return lyrics
+        except Exception as e:
+            self.log(f"   ⚠️  解析USLT帧失败: {e}")
+        
+        # 方法2：查找SYLT（同步歌词）
+        try:
+            sylt_frames = id3_tags.getall('SYLT')
+            if sylt_frames:
+                sylt = sylt_frames[0]
+                lyric_lines = []
+                
+                # SYLT歌词带时间戳，格式化为LRC格式
+                if hasattr(sylt, 'lyrics') and sylt.lyrics:
+                    for time_ms, text in sylt.lyrics:
+                        # 毫秒转换为 [mm:ss.xx] 格式
+                        minutes = time_ms // 60000
+                        seconds = (time_ms % 60000) // 1000
+                        hundredths = (time_ms % 1000) // 10
+                        time_tag = f"[{minutes:02d}:{seconds:02d}.{hundredths:02d}]"
+                        lyric_lines.append(f"{time_tag}{text}")
+                    
+                    lyrics = '\n'.join(lyric_lines)
+                    self.log(f"   ✅ 从 [SYLT] 帧找到同步歌词 ({len(sylt.lyrics)} 行)")
+                    return lyrics
+        except Exception as e:
+            self.log(f"   ⚠️  解析SYLT帧失败: {e}")
+        
+        # 方法3：遍历所有标签查找歌词相关帧
+        try:
+            for frame_id, frame in id3_tags.items():
+                # 检查是否为歌词帧
+                if isinstance(frame, USLT):
+                    lyrics = frame.text
+                    if isinstance(lyrics, bytes):
+                        lyrics = self._decode_lyrics_bytes(lyrics)
+                    self.log(f"   ✅ 通过遍历找到 [USLT: {frame_id}] 歌词")
+                    return lyrics
+                elif isinstance(frame, SYLT):
+                    if hasattr(frame, 'lyrics') and frame.lyrics:
+                        lyric_lines = []
+                        for time_ms, text in frame.lyrics:
+                            minutes = time_ms // 60000
+                            seconds = (time_ms % 60000) // 1000
+                            hundredths = (time_ms % 1000) // 10
+                            time_tag = f"[{minutes:02d}:{seconds:02d}.{hundredths:02d}]"
+                            lyric_lines.append(f"{time_tag}{text}")
+                        lyrics = '\n'.join(lyric_lines)
+                        self.log(f"   ✅ 通过遍历找到 [SYLT: {frame_id}] 同步歌词")
+                        return lyrics
+        except Exception as e:
+            self.log(f"   ⚠️  遍历标签失败: {e}")
+        
+        # 方法4：查找包含"LYRICS"的自定义文本帧（TXXX）
+        try:
+            for frame_id, frame in id3_tags.items():
+                if 'TXXX:' in frame_id and 'LYRICS' in frame_id.upper():
+                    if hasattr(frame, 'text'):
+                        lyrics = frame.text[0] if isinstance(frame.text, list) else frame.text
+                    else:
+                        lyrics = str(frame)
+                    
+                    if isinstance(lyrics, bytes):
+                        lyrics = self._decode_lyrics_bytes(lyrics)
+                    
+                    self.log(f"   ✅ 找到自定义歌词帧 [{frame_id}]")
+                    return lyrics
+        except Exception as e:
+            self.log(f"   ⚠️  查找自定义歌词帧失败: {e}")
+        
+        self.log("   ❌ 未找到MP3内嵌歌词")
+        return None
+    
+    def _decode_lyrics_bytes(self, lyric_bytes):
+        """尝试多种编码解码歌词字节"""
+        encodings = ['utf-8', 'gbk', 'gb2312', 'big5', 'latin-1', 'utf-16', 'utf-16le']
+        
+        for encoding in encodings:
+            try:
+                return lyric_bytes.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        
+        # 所有编码都失败，使用忽略错误的方式解码
+        try:
+            return lyric_bytes.decode('utf-8', errors='ignore')
+        except:
+            return str(lyric_bytes)
+    
+    def _extract_mp3_cover(self, id3_tags):
+        """提取MP3封面"""
+        if not id3_tags:
+            return
+        
+        # 查找APIC帧（专辑图片）
+        for frame_id, frame in id3_tags.items():
+            if frame_id.startswith('APIC:'):
+                if hasattr(frame, 'data'):
+                    self.metadata['cover'] = frame.data
+                    self.log("   🖼️  找到封面图片")
+                    break
+    
+    def _parse_flac(self):
+        """FLAC解析器"""
+        from mutagen.flac import FLAC
+        
+        try:
+            audio = FLAC(self._source())
+            
+            self._apply_field_plan(audio.tags, 'vorbis')
+            self.metadata['format'] = 'FLAC'
+            
+            # 提取FLAC封面
+            if audio.pictures:
+                self.metadata['cover'] = audio.pictures[0].data
+                self.log("   🖼️  找到封面图片")
+            
+            # 提取歌词
+            self.metadata['lyrics'] = self._extract_generic_lyrics(audio)
+            
+            # 获取时长
+            if hasattr(audio, 'info') and hasattr(audio.info, 'length'):
+                self.metadata['duration'] = audio.info.length
+            
+            return self.metadata
+            
+        except Exception as e:
+            self.log(f"❌ FLAC解析失败: {e}")
+            return None
+    
+    def _parse_m4a(self):
+        """M4A/MP4解析器"""
+        from mutagen.mp4 import MP4
+        
+        try:
+            audio = MP4(self._source())
+            
+            self._apply_field_plan(audio.tags, 'mp4')
+            self.metadata['format'] = 'M4A/MP4'
+            
+            # 封面
+            if 'covr' in audio:
+                self.metadata['cover'] = audio['covr'][0]
+                self.log("   🖼️  找到封面图片")
+            
+            # 歌词
+            self.metadata['lyrics'] = self._extract_generic_lyrics(audio)
+            
+            # 时长
+            if hasattr(audio, 'info') and hasattr(audio.info, 'length'):
+                self.metadata['duration'] = audio.info.length
+            
+            return self.metadata
+            
+        except Exception as e:
+            self.log(f"❌ M4A/MP4解析失败: {e}")
+            return None
+    
+    def _parse_ogg(self):
+        """OGG解析器"""
+        from mutagen.oggvorbis import OggVorbis
+        
+        try:
+            audio = OggVorbis(self._source())
+            
+            self._apply_field_plan(audio.tags, 'vorbis')
+            self.metadata['format'] = 'OGG'
+            
+            self.metadata['lyrics'] = self._extract_generic_lyrics(audio)
+            
+            if hasattr(audio, 'info') and hasattr(audio.info, 'length'):
+                self.metadata['duration'] = audio.info.length
+            
+            return self.metadata
+            
+        except Exception as e:
+            self.log(f"❌ OGG解析失败: {e}")
+            return None
+    
+    def _parse_opus(self):
+        """Opus解析器"""
+        from mutagen.oggopus import OggOpus
+        
+        try:
+            audio = OggOpus(self._source())
+            
+            self._apply_field_plan(audio.tags, 'vorbis')
+            self.metadata['format'] = 'OPUS'
+            
+            self.metadata['lyrics'] = self._extract_generic_lyrics(audio)
+            
+            if hasattr(audio, 'info') and hasattr(audio.info, 'length'):
+                self.metadata['duration'] = audio.info.length
+            
+            return self.metadata
+            
+        except Exception as e:
+            self.log(f"❌ OPUS解析失败: {e}")
+            return None
+    
+    def _parse_generic(self):
+        """通用解析器（用于其他格式）"""
+        from mutagen import File
+        
+        try:
+            audio = File(self._source(), easy=False)
+            if audio is None and self.extension == '.aac':
+                # 裸AAC（ADTS）只能靠文件扩展名识别，内存数据按格式提示直接使用AAC解析器
+                from mutagen.aac import AAC
+                audio = AAC(self._source())
+            if audio is None:
+                self.log("❌ 无法识别的音频格式")
+                return None
+            
+            self.metadata['format'] = self.extension[1:].upper() or type(audio).__name__.upper()
+            
+            # 根据标签类型选择字段表中对应的查找计划
+            tags = getattr(audio, 'tags', None)
+            if tags is not None:
+                self._apply_field_plan(tags, tag_family(tags))
+            
+            # 通用歌词提取
+            self.metadata['lyrics'] = self._extract_generic_lyrics(audio)
+            
+            # 通用封面提取
+            self.metadata['cover'] = self._extract_generic_cover(audio)
+            
+            # 时长
+            if hasattr(audio, 'info') and hasattr(audio.info, 'length'):
+                self.metadata['duration'] = audio.info.length
+            
+            return self.metadata
+            
+        except Exception as e:
+            self.log(f"❌ 通用解析失败: {e}")
+            return None
+    
+    def _extract_generic_lyrics(self, audio):
+        """通用歌词提取（用于非MP3格式）"""
+        if audio is None:
+            return None
+        
+        lyrics_fields = [
+            'lyrics', 'LYRICS', 'Lyrics', '©lyr',
+            '----:com.apple.iTunes:LYRICS'
+        ]
+        
+        for field in lyrics_fields:
+            try:
+                if hasattr(audio, 'tags') and field in audio.tags:
+                    value = audio.tags[field]
+                    if isinstance(value, list) and value:
+                        lyrics = value[0]
+                        if isinstance(lyrics, bytes):
+                            lyrics = self._decode_lyrics_bytes(lyrics)
+                        self.log(f"   ✅ 找到歌词 [{field}]")
+                        return lyrics
+                elif field in audio:
+                    value = audio[field]
+                    if isinstance(value, list) and value:
+                        lyrics = value[0]
+                        if isinstance(lyrics, bytes):
+                            lyrics = self._decode_lyrics_bytes(lyrics)
+                        self.log(f"   ✅ 找到歌词 [{field}]")
+                        return lyrics
+            except:
+                continue
+        
+        return None
+    
+    def _extract_generic_cover(self, audio):
+        """通用封面提取"""
+        if audio is None:
+            return None
+        
+        # MP4/M4A
+        if 'covr' in audio:
+            return audio['covr'][0]
+        
+        # FLAC
+        if hasattr(audio, 'pictures') and audio.pictures:
+            return audio.pictures[0].data
+        
+        return None
+    
+    def _apply_field_plan(self, tags, family):
+        """按预编译的查找计划从标签中取出所有规范字段"""
+        if tags is None:
+            return
+        if family == 'vorbis':
+            tags = _vorbis_index(tags)
+        elif family not in TAG_FAMILIES:
+            # APEv2等键名大小写不敏感的标签，统一按小写键建立索引
+            tags = {key.lower(): tags[key] for key in tags.keys()}
+        
+        # 先取已有键再查找，避免缺失字段在mutagen的get()中抛出KeyError
+        if family == 'id3':
+            present = _id3_keys(tags)
+        else:
+            present = tags.keys() if isinstance(tags, dict) else set(tags.keys())
+        for field, key, convert in compile_field_plan(family):
+            if key not in present:
+                continue
+            value = tags[present[key]] if family == 'id3' else tags[key]
+            if not value:
+                continue
+            try:
+                self.metadata[field] = convert(value)
+            except (IndexError, TypeError, ValueError, AttributeError):
+                continue
+
+class MetadataSaver:
+    """元数据保存器"""
+    
+    @staticmethod
+    def save_all(metadata, base_dir=".", verbose=True):
+        """保存所有元数据（verbose 为假时不打印保存结果，供批量导出使用）"""
+        if not metadata:
+            print("❌ 没有可保存的元数据")
+            return False
+        
+        base_name = Path(metadata['file_name']).stem
+        base_name = base_name.replace(' ', '_').replace('/', '_')
+        save_path = Path(base_dir)
+        save_path.mkdir(parents=True, exist_ok=True)
+        
+        results = []
+        
+        # 1. 保存文本元数据
+        txt_file = save_path / f"{base_name}_metadata.txt"
+        MetadataSaver._save_text_metadata(metadata, txt_file)
+        results.append(f"📄 文本: {txt_file.name}")
+        
+        # 2. 保存歌词
+        if metadata['lyrics']:
+            lrc_file = save_path / f"{base_name}_lyrics.lrc"
+            if MetadataSaver._save_lyrics(metadata['lyrics'], lrc_file):
+                results.append(f"🎵 歌词: {lrc_file.name}")
+        
+        # 3. 保存封面
+        if metadata['cover']:
+            png_file = save_path / f"{base_name}_cover.png"
+            if MetadataSaver._save_cover(metadata['cover'], png_file):
+                results.append(f"🖼️  封面: {png_file.name}")
+        
+        # 显示结果
+        if not verbose:
+            return True
+        print("\n" + "="*50)
+        print("✅ 保存完成!")
+        for result in results:
+            print(f"  {result}")
+        print("="*50)
+        return True
+    
+    @staticmethod
+    def _save_text_metadata(metadata, filepath):
+        """保存文本元数据"""
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write("="*40 + "\n")
+                f.write("音乐文件元数据报告\n")
+                f.write("="*40 + "\n\n")
+                
+                f.write(f"📁 文件: {metadata['file_name']}\n")
+                f.write(f"🎵 格式: {metadata['format'] or '未知'}\n")
+                if metadata['duration']:
+                    mins = int(metadata['duration'] // 60)
+                    secs = int(metadata['duration'] % 60)
+                    f.write(f"⏱️  时长: {mins}:{secs:02d}\n")
+                f.write("-"*30 + "\n\n")
+                
+                fields = [
+                    ("🎵 标题", metadata['title']),
+                    ("👤 作者", metadata['artist']),
+                    ("💿 专辑", metadata['album']),
+                    ("#️⃣ 音轨号", metadata['track']),
+                    ("💿 碟号", metadata['disc']),
+                ]
+                
+                for label, value in fields:
+                    f.write(f"{label}: {value or '未找到'}\n")
+                
+                for label, key in EXTENDED_FIELD_LABELS:
+                    if metadata.get(key):
+                        f.write(f"{label}: {metadata[key]}\n")
+                
+                f.write("\n" + "-"*30 + "\n")
+                f.write(f"📝 歌词: {'✅ 已提取' if metadata['lyrics'] else '❌ 未找到'}\n")
+                f.write(f"🖼️  封面: {'✅ 已提取' if metadata['cover'] else '❌ 未找到'}\n")
+            
+            return True
+        except Exception as e:
+            print(f"⚠️  保存文本元数据失败: {e}")
+            return False
+    
+    @staticmethod
+    def _save_lyrics(lyrics_data, filepath):
+        """保存歌词为LRC文件"""
+        try:
+            # 确保是字符串
+            if isinstance(lyrics_data, bytes):
+                lyrics_text = lyrics_data.decode('utf-8', errors='ignore')
+            else:
+                lyrics_text = str(lyrics_data)
+            
+            # 如果是纯文本，添加基本的LRC标签
+            if not lyrics_text.strip().startswith('['):
+                lyrics_text = f"[ar:Unknown]\n[ti:Unknown]\n\n{lyrics_text}"
+            
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(lyrics_text)
+            return True
+        except Exception as e:
+            print(f"⚠️  歌词保存失败: {e}")
+            return False
+    
+    @staticmethod
+    def _save_cover(cover_data, filepath):
+        """保存封面为PNG文件"""
+        try:
+            if isinstance(cover_data, bytes):
+                with open(filepath, 'wb') as f:
+                    f.write(cover_data)
+                return True
+            elif hasattr(cover_data, 'data'):
+                with open(filepath, 'wb') as f:
+                    f.write(cover_data.data)
+                return True
+            else:
+                print("⚠️  封面数据格式无法识别")
+                return False
+        except Exception as e:
+            print(f"⚠️  封面保存失败: {e}")
+            return False
+
+def display_metadata(metadata):
+    """美观地显示元数据"""
+    if not metadata:
+        return
+    
+    print("\n" + "✨" + "="*48 + "✨")
+    print("                 元数据解析结果")
+    print("✨" + "="*48 + "✨")
+    
+    # 基础信息
+    print(f"📁 文件: {metadata['file_name']}")
+    print(f"🎵 格式: {metadata['format'] or '未知'}")
+    if metadata['duration']:
+        mins = int(metadata['duration'] // 60)
+        secs = int(metadata['duration'] % 60)
+        print(f"⏱️  时长: {mins}分{secs}秒")
+    
+    print("-"*50)
+    
+    # 核心元数据
+    meta_items = [
+        ("🎵 标题", metadata['title']),
+        ("👤 作者", metadata['artist']), 
+        ("💿 专辑", metadata['album']),
+        ("#️⃣ 音轨号", metadata['track']),
+        ("💿 碟号", metadata['disc']),
+    ]
+    
+    for icon, value in meta_items:
+        if value:
+            print(f"{icon}  {value}")
+        else:
+            print(f"{icon}  [未找到]")
+    
+    for icon, key in EXTENDED_FIELD_LABELS:
+        if metadata.get(key):
+            print(f"{icon}  {metadata[key]}")
+    
+    print("-"*50)
+    
+    # 状态信息
+    status_items = [
+        ("📝 歌词", metadata['lyrics']),
+        ("🖼️  封面", metadata['cover']),
+    ]
+    
+    for icon, data in status_items:
+        status = "✅ 已提取" if data else "❌ 未找到"
+        print(f"{icon}: {status}")
+
+def debug_mp3_tags(file_path):
+    """调试函数：显示MP3文件的所有ID3标签"""
+    from mutagen.id3 import ID3, USLT, SYLT, ID3NoHeaderError
+    
+    try:
+        id3 = ID3(file_path)
+        print(f"\n🔍 MP3标签调试信息: {Path(file_path).name}")
+        print("="*60)
+        
+        print(f"找到 {len(id3.keys())} 个标签帧:")
+        
+        # 分类显示标签
+        lyric_frames = []
+        cover_frames = []
+        text_frames = []
+        other_frames = []
+        
+        for frame_id in id3.keys():
+            if 'USLT' in frame_id or 'SYLT' in frame_id:
+                lyric_frames.append(frame_id)
+            elif 'APIC' in frame_id:
+                cover_frames.append(frame_id)
+            elif frame_id.startswith(('T', 'W', 'C')):  # 文本帧
+                text_frames.append(frame_id)
+            else:
+                other_frames.append(frame_id)
+        
+        # 显示歌词帧
+        if lyric_frames:
+            print(f"\n🎵 歌词相关帧 ({len(lyric_frames)} 个):")
+            for frame_id in lyric_frames:
+                frame = id3[frame_id]
+                frame_type = "USLT" if 'USLT' in frame_id else "SYLT"
+                print(f"  • {frame_id} ({frame_type})")
+                if isinstance(frame, USLT):
+                    text_preview = frame.text[:100] + "..." if len(frame.text) > 100 else frame.text
+                    print(f"    内容预览: {text_preview}")
+                elif isinstance(frame, SYLT):
+                    print(f"    同步歌词行数: {len(frame.lyrics) if hasattr(frame, 'lyrics') else '未知'}")
+        
+        # 显示封面帧
+        if cover_frames:
+            print(f"\n🖼️  封面帧 ({len(cover_frames)} 个):")
+            for frame_id in cover_frames:
+                frame = id3[frame_id]
+                print(f"  • {frame_id}")
+                if hasattr(frame, 'mime'):
+                    print(f"    类型: {frame.mime}")
+                if hasattr(frame, 'data'):
+                    print(f"    大小: {len(frame.data)} 字节")
+        
+        # 显示重要文本帧
+        important_text = ['TIT2', 'TPE1', 'TALB', 'TRCK', 'TPOS']
+        if any(frame in text_frames for frame in important_text):
+            print(f"\n📝 重要文本帧:")
+            for frame_id in important_text:
+                if frame_id in id3:
+                    frame = id3[frame_id]
+                    value = frame.text[0] if hasattr(frame, 'text') else str(frame)
+                    print(f"  • {frame_id}: {value}")
+        
+        # 显示其他帧数量
+        if other_frames:
+            print(f"\n📋 其他帧 ({len(other_frames)} 个):")
+            print(f"  {', '.join(other_frames[:10])}")
+            if len(other_frames) > 10:
+                print(f"  ... 还有 {len(other_frames)-10} 个")
+        
+        print("="*60)
+        
+    except ID3NoHeaderError:
+        print("❌ 此MP3文件没有ID3标签")
+    except Exception as e:
+        print(f"❌ 调试失败: {e}")
+
+# ==================== 单文件记录 ====================
+
+def _cover_bytes(cover):
+    """取出封面原始字节（兼容bytes / MP4Cover / 带data属性的对象）"""
+    if cover is None:
+        return None
+    if isinstance(cover, (bytes, bytearray)):
+        return bytes(cover)
+    if hasattr(cover, 'data'):
+        return cover.data
+    return None
+
+
+def metadata_to_record(metadata, entry):
+    """将元数据转换为可JSON序列化的记录（封面只保留大小和SHA1）"""
+    record = {'path': entry}
+    for key, value in metadata.items():
+        if key == 'cover':
+            data = _cover_bytes(value)
+            record['cover_size'] = len(data) if data else 0
+            record['cover_sha1'] = hashlib.sha1(data).hexdigest() if data else None
+        elif value is None or isinstance(value, (int, float)):
+            record[key] = value
+        elif isinstance(value, bytes):
+            record[key] = value.decode('utf-8', errors='ignore')
+        else:
+            record[key] = str(value)
+    return record
+
+
+def extract_quiet(target):
+    """静默解析单个文件（路径或已创建的提取器），返回 (元数据, 错误信息)"""
+    if not isinstance(target, MusicMetadataExtractor):
+        target = MusicMetadataExtractor(target)
+    
+    messages = []
+    target.log = messages.append
+    try:
+        metadata = target.extract()
+    except Exception as e:
+        return None, str(e)
+
+    if metadata is None:
+        errors = [message.strip() for message in messages if '❌' in message]
+        return None, errors[-1] if errors else '解析失败'
+    return metadata, None
+
+
+def extract_record(target, entry):
+    """静默解析单个文件并返回记录；失败时记录最后一条错误信息"""
+    metadata, error = extract_quiet(target)
+    if metadata is None:
+        return {'path': entry, 'error': error}
+    return metadata_to_record(metadata, entry)
+
+
+# ==================== 归档条目路径 ====================
+
+# 归档条目路径的分隔符：album.zip!01.mp3
+ARCHIVE_SEPARATOR = '!'
+
+ARCHIVE_EXTENSIONS = (
+    '.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz'
+)
+
+
+def is_archive(name):
+    """根据文件名判断是否为支持的归档"""
+    return str(name).lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def split_archive_entry(entry):
+    """
+    拆分 'archive!member' 条目，普通文件返回 (entry, None)
+    从左到右找第一个紧跟在归档文件名之后的分隔符，目录名中的 '!'（如 'Wham!/alb.zip!01.mp3'）不影响拆分
+    """
+    pos = entry.find(ARCHIVE_SEPARATOR)
+    while pos >= 0:
+        archive, member = entry[:pos], entry[pos + 1:]
+        if member and is_archive(archive):
+            return archive, member
+        pos = entry.find(ARCHIVE_SEPARATOR, pos + 1)
+    return entry, None
+
+
+def inspect_mp3_frames(file_path):
+    """收集MP3文件的ID3帧概要（供命令行debug子命令输出JSON）"""
+    from mutagen.id3 import ID3, USLT, SYLT
+
+    id3 = ID3(file_path)
+    frames = []
+    for frame_id, frame in id3.items():
+        info = {'id': frame_id, 'type': type(frame).__name__}
+        if isinstance(frame, USLT):
+            info['text'] = frame.text[:100]
+        elif isinstance(frame, SYLT):
+            info['lines'] = len(frame.lyrics)
+        elif hasattr(frame, 'data'):
+            info['size'] = len(frame.data)
+            if hasattr(frame, 'mime'):
+                info['mime'] = frame.mime
+        elif hasattr(frame, 'text'):
+            info['text'] = [str(t) for t in frame.text]
+        frames.append(info)
+    return {'path': str(file_path), 'frames': frames}
+
+
+def _emit(obj, pretty=False):
+    """向标准输出写一条JSON"""
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None) + "\n")
+    sys.stdout.flush()
+
+
+# 在 smpe_batch 中实现的子命令 -> 帮助说明
+BATCH_COMMANDS = {
+    'manifest': '遍历目录生成文件清单',
+    'scan': '按分片扫描清单中的文件',
+    'merge': '合并分片输出并去重',
+}
+
+
+def cli_main(argv):
+    """命令行入口（非交互模式，结果以JSON输出到标准输出）"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='music_metadata_mp3_fixed.py',
+        description='SMPE - Song Metadata Parsing Engine 命令行模式'
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_extract = sub.add_parser('extract', help='提取元数据并输出JSON（每个文件一行）')
+    p_extract.add_argument('files', nargs='+',
+                           help='音乐文件、ZIP/TAR归档或 archive!member 路径（- 表示从标准输入读取）')
+    p_extract.add_argument('--format', help='标准输入数据的格式提示，如 mp3 / flac / audio/mp4')
+    p_extract.add_argument('--pretty', action='store_true', help='格式化输出JSON')
+
+    p_lyrics = sub.add_parser('lyrics', help='提取歌词')
+    p_lyrics.add_argument('file', help='音乐文件路径')
+    p_lyrics.add_argument('-o', '--output', help='保存为LRC文件（省略则在JSON中输出歌词）')
+
+    p_cover = sub.add_parser('cover', help='提取封面')
+    p_cover.add_argument('file', help='音乐文件路径')
+    p_cover.add_argument('-o', '--output', help='封面保存路径（默认 <文件名>_cover.png）')
+
+    p_debug = sub.add_parser('debug', help='输出MP3文件的ID3帧结构')
+    p_debug.add_argument('file', help='MP3文件路径')
+    p_debug.add_argument('--pretty', action='store_true', help='格式化输出JSON')
+
+    # 批量子命令（清单 / 分片扫描 / 合并）在独立模块中实现，只在确实用到时才导入；
+    # 其他情况只登记名称，使 --help 中仍能列出
+    if argv and argv[0] in BATCH_COMMANDS:
+        import smpe_batch
+        smpe_batch.add_batch_commands(sub)
+    else:
+        for name, help_text in BATCH_COMMANDS.items():
+            sub.add_parser(name, help=help_text, add_help=False)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'extract':
+        failed = 0
+        for file_path in args.files:
+            archive, member = split_archive_entry(file_path)
+            if file_path == '-':
+                target = MusicMetadataExtractor.from_buffer(
+                    sys.stdin.buffer.read(), format_hint=args.format, name='<stdin>')
+                records = [extract_record(target, file_path)]
+            elif is_archive(file_path) and Path(file_path).is_file():
+                import smpe_batch
+                records = smpe_batch.scan_archive(file_path)
+            elif member is not None and not Path(file_path).exists():
+                import smpe_batch
+                records = smpe_batch.scan_archive(archive, archive, [member])
+            else:
+                records = [extract_record(file_path, file_path)]
+            
+            for record in records:
+                failed += 'error' in record
+                _emit(record, args.pretty)
+        return 1 if failed else 0
+
+    if args.command in ('lyrics', 'cover'):
+        metadata, error = extract_quiet(args.file)
+        if metadata is None:
+            _emit({'path': args.file, 'error': error})
+            return 1
+
+        if args.command == 'lyrics':
+            if not metadata['lyrics']:
+                _emit({'path': args.file, 'error': '无歌词可保存'})
+                return 1
+            if not args.output:
+                _emit({'path': args.file, 'lyrics': metadata_to_record(metadata, args.file)['lyrics']})
+                return 0
+            with contextlib.redirect_stdout(sys.stderr):
+                saved = MetadataSaver._save_lyrics(metadata['lyrics'], args.output)
+            if not saved:
+                _emit({'path': args.file, 'error': '歌词保存失败'})
+                return 1
+            _emit({'path': args.file, 'output': args.output})
+            return 0
+
+        cover = _cover_bytes(metadata['cover'])
+        if not cover:
+            _emit({'path': args.file, 'error': '无封面可保存'})
+            return 1
+        output = args.output or f"{Path(args.file).stem}_cover.png"
+        with contextlib.redirect_stdout(sys.stderr):
+            saved = MetadataSaver._save_cover(cover, output)
+        if not saved:
+            _emit({'path': args.file, 'error': '封面保存失败'})
+            return 1
+        _emit({'path': args.file, 'output': output, 'size': len(cover)})
+        return 0
+
+    if args.command == 'debug':
+        try:
+            _emit(inspect_mp3_frames(args.file), args.pretty)
+        except Exception as e:
+            _emit({'path': args.file, 'error': str(e)})
+            return 1
+        return 0
+
+    # 批量命令的进度信息输出到标准错误，标准输出只写JSON摘要
+    import smpe_batch
+    stdout = sys.stdout
+
+    def emit(obj):
+        with contextlib.redirect_stdout(stdout):
+            _emit(obj)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        return smpe_batch.run_batch_command(parser, args, emit)
+
+
+def main():
+    """主交互函数"""
+    # 清除屏幕（跨平台）
+    os.system('cls' if os.name == 'nt' else 'clear')
+    
+    # 伪3D ASCII艺术标题：SMPE
+    print("\n" + "="*60)
+    print("\n")
+    print("      ███████╗███╗   ███╗██████╗ ███████╗")
+    print("      ██╔════╝████╗ ████║██╔══██╗██╔════╝")
+    print("      ███████╗██╔████╔██║██████╔╝█████╗  ")
+    print("      ╚════██║██║╚██╔╝██║██╔═══╝ ██╔══╝  ")
+    print("      ███████║██║ ╚═╝ ██║██║     ███████╗")
+    print("      ╚══════╝╚═╝     ╚═╝╚═╝     ╚══════╝")
+    print("\n")
+    print("      ╔══════════════════════════════════════════╗")
+    print("      ║     S O N G   M E T A D A T A           ║")
+    print("      ║     P A R S I N G   E N G I N E         ║")
+    print("      ╚══════════════════════════════════════════╝")
+    print("\n" + "="*60)
+    print("          专业音乐文件元数据解析工具 (MP3歌词强化版)")
+    print("="*60)
+    print("📢 支持格式: MP3, FLAC, M4A, MP4, OGG, OPUS")
+    print("📢 命令: DL=保存全部 | L=仅歌词 | C=仅封面 | DEBUG=查看MP3标签")
+    print("📢 输入 'exit' 或 'quit' 退出")
+    print("-"*60)
+    
+    # 添加一点延迟让用户欣赏标题
+    import time
+    time.sleep(0.5)
+    
+    current_metadata = None
+    
+    while True:
+        try:
+            user_input = input("\n🎯 请输入文件路径或命令: ").strip()
+            
+            # 退出命令
+            if user_input.lower() in ['exit', 'quit', 'q']:
+                print("\n" + "="*60)
+                print("        感谢使用 SMPE - Song Metadata Parsing Engine")
+                print("="*60)
+                print("\n再见！👋")
+                break
+            # 保存命令
+            if user_input.upper() == 'DL':
+                if current_metadata:
+                    MetadataSaver.save_all(current_metadata)
+                else:
+                    print("⚠️  请先解析一个文件")
+                continue
+            elif user_input.upper() == 'L':
+                if current_metadata and current_metadata['lyrics']:
+                    base_name = Path(current_metadata['file_name']).stem
+                    lrc_file = f"{base_name}_lyrics.lrc"
+                    if MetadataSaver._save_lyrics(current_metadata['lyrics'], lrc_file):
+                        print(f"✅ 歌词已保存: {lrc_file}")
+                else:
+                    print("⚠️  无歌词可保存")
+                continue
+            elif user_input.upper() == 'C':
+                if current_metadata and current_metadata['cover']:
+                    base_name = Path(current_metadata['file_name']).stem
+                    png_file = f"{base_name}_cover.png"
+                    if MetadataSaver._save_cover(current_metadata['cover'], png_file):
+                        print(f"✅ 封面已保存: {png_file}")
+                else:
+                    print("⚠️  无封面可保存")
+                continue
+            elif user_input.upper() == 'DEBUG':
+                if current_metadata and current_metadata['format'] == 'MP3':
+                    debug_mp3_tags(current_metadata['file_name'])
+                elif current_metadata:
+                    print("⚠️  DEBUG命令仅支持MP3文件")
+                else:
+                    print("⚠️  请先解析一个MP3文件")
+                continue
+            
+            # 文件路径处理
+            file_path = user_input
+            for quote in ['"', "'"]:
+                if file_path.startswith(quote) and file_path.endswith(quote):
+                    file_path = file_path[1:-1]
+            
+            if not Path(file_path).exists():
+                print(f"❌ 文件不存在: {file_path}")
+                continue
+            
+            # 解析文件
+            extractor = MusicMetadataExtractor(file_path)
+            current_metadata = extractor.extract()
+            
+            if current_metadata:
+                display_metadata(current_metadata)
+            else:
+                print("❌ 文件解析失败")
+                
+        except KeyboardInterrupt:
+            print("\n\n👋 程序已中断")
+            break
+        except Exception as e:
+            print(f"❌ 发生错误: {e}")
@@ -0,0 +1,30 @@
+"""
+测试共用的路径设置与样本
+样本生成复用 benchmarks/_samples.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from _samples import make_mp3, make_library  # noqa: E402
+
+pytest.importorskip('mutagen')
+
+
+@pytest.fixture
+def sample_mp3(tmp_path):
+    """一个带歌词和小封面的MP3样本"""
+    return make_mp3(tmp_path / 'sample.mp3', frames=40, album='Album', track='1/9',
+                    lyrics='[00:00.00]la', cover_size=2048)
+
+
+@pytest.fixture
+def library(tmp_path):
+    """40个MP3样本组成的曲库目录"""
+    return make_library(tmp_path / 'library', 40, dirs=4)
@@ -0,0 +1,229 @@
+"""
+归档扫描测试：成员读取器、条目路径拆分、归档与磁盘文件解析结果一致、损坏归档的错误记录
+"""
+
+import io
+import os
+import sys
+import errno
+import tarfile
+import zipfile
+import subprocess
+
+import pytest
+
+import smpe_core as smpe
+import smpe_batch
+from conftest import ROOT, make_mp3
+
+
+# 大于尾部缓存（MEMBER_TAIL_CACHE），头部和尾部之间留有未缓存区域
+DATA = bytes(range(256)) * 4096
+
+
+class CountingOpener:
+    """记录数据流被（重新）打开次数的opener"""
+
+    def __init__(self, data):
+        self.data = data
+        self.opens = 0
+
+    def __call__(self):
+        self.opens += 1
+        return io.BytesIO(self.data)
+
+
+# ==================== 条目路径拆分 ====================
+
+@pytest.mark.parametrize('entry, expected', [
+    ('album.zip!01.mp3', ('album.zip', '01.mp3')),
+    ('a/album.tar.gz!CD1/01.flac', ('a/album.tar.gz', 'CD1/01.flac')),
+    ('Wham!/alb.zip!x/00.mp3', ('Wham!/alb.zip', 'x/00.mp3')),
+    ('!!!/a.tgz!b!c.mp3', ('!!!/a.tgz', 'b!c.mp3')),
+    ('x!y.zip!z.mp3', ('x!y.zip', 'z.mp3')),
+    ('Panic! at the Disco/01.mp3', ('Panic! at the Disco/01.mp3', None)),
+    ('album.zip', ('album.zip', None)),
+    ('album.zip!', ('album.zip!', None)),
+    ('notes!.txt', ('notes!.txt', None)),
+])
+def test_split_archive_entry(entry, expected):
+    assert smpe.split_archive_entry(entry) == expected
+
+
+def test_shard_of_uses_archive_path():
+    entries = [f'Wham!/alb.zip!{i:02d}.mp3' for i in range(20)]
+    assert len({smpe_batch.shard_of(e, 7) for e in entries}) == 1
+
+
+# ==================== 成员读取器 ====================
+
+def test_range_reader_reads_only_its_window():
+    reader = smpe_batch.RangeReader(io.BytesIO(DATA), 100, 50, 'm.mp3')
+    assert reader.read() == DATA[100:150]
+    assert reader.read() == b''
+
+    reader.seek(-10, io.SEEK_END)
+    assert reader.tell() == 40
+    assert reader.read(100) == DATA[140:150]
+
+    reader.seek(5)
+    reader.seek(5, io.SEEK_CUR)
+    assert reader.read(3) == DATA[110:113]
+
+
+def test_range_reader_negative_seek_is_einval():
+    reader = smpe_batch.RangeReader(io.BytesIO(DATA), 100, 50)
+    with pytest.raises(OSError) as info:
+        reader.seek(-1)
+    assert info.value.errno == errno.EINVAL
+
+
+def test_stream_reader_serves_head_and_tail_from_cache():
+    opener = CountingOpener(DATA)
+    reader = smpe_batch.StreamMemberReader(opener(), len(DATA), 'm', opener=opener, head_limit=1024)
+
+    assert reader.read(512) == DATA[:512]
+    reader.seek(-128, io.SEEK_END)
+    assert reader.read() == DATA[-128:]
+    # 头部缓存内回退不需要重新解压
+    reader.seek(100)
+    assert reader.read(400) == DATA[100:500]
+    # 跨越头部缓存边界的读取
+    reader.seek(1000)
+    assert reader.read(48) == DATA[1000:1048]
+    assert opener.opens == 2  # 读取尾部后再回到头部缓存之外才重开
+
+
+def test_stream_reader_reopens_for_middle_region():
+    opener = CountingOpener(DATA)
+    reader = smpe_batch.StreamMemberReader(opener(), len(DATA), 'm', opener=opener, head_limit=256)
+    reader.seek(800000)
+    assert reader.read(16) == DATA[800000:800016]
+    reader.seek(400000)
+    assert reader.read(16) == DATA[400000:400016]
+    assert opener.opens == 2
+
+
+def test_stream_reader_without_opener_cannot_rewind_past_head():
+    reader = smpe_batch.StreamMemberReader(io.BytesIO(DATA), len(DATA), 'm', head_limit=256)
+    reader.seek(800000)
+    reader.read(16)
+    reader.seek(100)
+    assert reader.read(16) == DATA[100:116]
+    reader.seek(400000)
+    with pytest.raises(io.UnsupportedOperation):
+        reader.read(16)
+
+
+def test_stream_reader_keeps_whole_id3v2_tag_in_head():
+    tag_size = 20000
+    header = b'ID3\x03\x00\x00' + bytes([0, (tag_size >> 14) & 0x7f, (tag_size >> 7) & 0x7f, tag_size & 0x7f])
+    data = header + DATA[:tag_size] + DATA
+    reader = smpe_batch.StreamMemberReader(io.BytesIO(data), len(data), 'm.mp3', head_limit=256)
+    reader.seek(-128, io.SEEK_END)
+    reader.read()
+    # 不可重开的数据流也能回到标签之后：头部缓存为整个标签再加 head_limit
+    reader.seek(tag_size + 10)
+    assert reader.read(200) == data[tag_size + 10:tag_size + 210]
+
+
+def test_stream_reader_negative_seek_is_einval():
+    reader = smpe_batch.StreamMemberReader(io.BytesIO(DATA), len(DATA), 'm')
+    with pytest.raises(OSError) as info:
+        reader.seek(-5, io.SEEK_SET)
+    assert info.value.errno == errno.EINVAL
+
+
+# ==================== 归档扫描 ====================
+
+def _record_without_path(record):
+    return {k: v for k, v in record.items() if k != 'path'}
+
+
+def _write_archive(path, files, kind):
+    if kind == 'stored.zip':
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zf:
+            for f in files:
+                zf.write(f, f'cd/{f.name}')
+    elif kind == 'deflated.zip':
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for f in files:
+                zf.write(f, f'cd/{f.name}')
+    else:
+        with tarfile.open(path, 'w:gz' if kind == 'tar.gz' else 'w') as tf:
+            for f in files:
+                tf.add(f, f'cd/{f.name}')
+
+
+@pytest.mark.parametrize('kind', ['stored.zip', 'deflated.zip', 'tar', 'tar.gz'])
+def test_archive_members_match_files_on_disk(tmp_path, kind):
+    files = [make_mp3(tmp_path / f'{i:02d}.mp3', title=f'Song {i}', lyrics='[00:01.00]x',
+                      cover_size=4096 * (i + 1)) for i in range(3)]
+    archive = tmp_path / f'album.{kind}'
+    _write_archive(archive, files, kind)
+
+    expected = {f'cd/{f.name}': _record_without_path(smpe.extract_record(f, f.name)) for f in files}
+    records = list(smpe_batch.scan_archive(archive, 'album'))
+    assert sorted(r['path'] for r in records) == sorted(f'album!{name}' for name in expected)
+    for record in records:
+        assert _record_without_path(record) == expected[record['path'].split('!', 1)[1]]
+
+
+@pytest.mark.parametrize('kind', ['deflated.zip', 'tar.gz'])
+def test_large_id3_tag_in_compressed_member(tmp_path, kind):
+    # 标签（主要是封面）大于头部缓存，压缩tar成员又不能重开
+    cover = smpe_batch.MEMBER_HEAD_CACHE + 1024 * 1024
+    mp3 = make_mp3(tmp_path / 'big.mp3', frames=400, cover_size=cover)
+    archive = tmp_path / f'big.{kind}'
+    _write_archive(archive, [mp3], kind)
+
+    expected = smpe.extract_record(mp3, 'big.mp3')
+    record, = smpe_batch.scan_archive(archive)
+    assert 'error' not in record
+    assert record['duration'] == expected['duration'] is not None
+    assert record['cover_sha1'] == expected['cover_sha1']
+
+
+def test_missing_member_is_reported(tmp_path):
+    mp3 = make_mp3(tmp_path / '01.mp3')
+    _write_archive(tmp_path / 'a.zip', [mp3], 'stored.zip')
+    records = list(smpe_batch.scan_archive(tmp_path / 'a.zip', 'a.zip', ['cd/01.mp3', 'cd/02.mp3']))
+    assert [r['path'] for r in records] == ['a.zip!cd/01.mp3', 'a.zip!cd/02.mp3']
+    assert 'error' not in records[0] and 'error' in records[1]
+
+
+@pytest.mark.parametrize('name, data', [
+    ('bad.zip', b'PK\x03\x04' + b'\x00' * 100),
+    ('bad.tar.gz', b'not a gzip stream'),
+])
+def test_corrupt_archive_yields_error_record(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    records = list(smpe_batch.scan_archive(path, name))
+    assert len(records) == 1
+    assert records[0]['path'] == name
+    assert records[0]['error'].startswith('归档读取失败')
+
+
+def test_extract_corrupt_archive_exits_nonzero(tmp_path):
+    path = tmp_path / 'bad.zip'
+    path.write_bytes(b'PK\x05\x06 truncated')
+    result = subprocess.run([sys.executable, str(ROOT / 'music_metadata_mp3_fixed.py'), 'extract', str(path)],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert '"error"' in result.stdout
+
+
+def test_scan_archive_under_directory_with_bang(tmp_path):
+    album = tmp_path / 'lib' / 'Wham!'
+    album.mkdir(parents=True)
+    files = [make_mp3(tmp_path / f'{i:02d}.mp3', title=f'Song {i}') for i in range(2)]
+    _write_archive(album / 'alb.zip', files, 'deflated.zip')
+
+    manifest = tmp_path / 'manifest.txt'
+    assert smpe_batch.build_manifest(tmp_path / 'lib', manifest) == 2
+    part = smpe_batch.scan_shard(manifest, 0, 1, tmp_path / 'out')
+    records = list(smpe_batch._iter_partial(part))
+    assert [r['path'] for r in records] == ['Wham!/alb.zip!cd/00.mp3', 'Wham!/alb.zip!cd/01.mp3']
+    assert all('error' not in r for r in records)
+    assert os.path.exists(part)
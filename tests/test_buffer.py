@@ -0,0 +1,127 @@
+"""
+内存数据解析测试：from_buffer 的各种数据源、BufferReader、文件头识别与格式提示
+"""
+
+import io
+import errno
+
+import pytest
+
+import smpe_core as smpe
+
+
+def _adts(frames=50, payload=200):
+    """裸AAC（ADTS）流：frames 个只含静音负载的帧"""
+    length = 7 + payload
+    header = bytes([0xFF, 0xF1, 0x50, 0x80 | (length >> 11), (length >> 3) & 0xFF,
+                    ((length & 7) << 5) | 0x1F, 0xFC])
+    return (header + b'\x00' * payload) * frames
+
+
+def _record(target):
+    record = smpe.extract_record(target, 'x')
+    record.pop('file_name', None)
+    return record
+
+
+# ==================== 数据源 ====================
+
+@pytest.mark.parametrize('wrap', [bytes, bytearray, memoryview, io.BytesIO])
+def test_from_buffer_matches_path(sample_mp3, wrap):
+    expected = _record(sample_mp3)
+    assert 'error' not in expected and expected['lyrics'] and expected['cover_size']
+
+    extractor = smpe.MusicMetadataExtractor.from_buffer(wrap(sample_mp3.read_bytes()))
+    assert extractor.extension == '.mp3'
+    assert _record(extractor) == expected
+
+
+@pytest.mark.parametrize('hint', ['mp3', '.MP3', 'audio/mpeg'])
+def test_from_buffer_with_format_hint(sample_mp3, hint):
+    extractor = smpe.MusicMetadataExtractor.from_buffer(sample_mp3.read_bytes(), format_hint=hint)
+    assert extractor.extension == '.mp3'
+    assert _record(extractor) == _record(sample_mp3)
+
+
+def test_from_buffer_name_suffix_is_used_as_format(sample_mp3):
+    extractor = smpe.MusicMetadataExtractor.from_buffer(sample_mp3.read_bytes(), name='upload.mp3')
+    assert extractor.extension == '.mp3'
+    assert smpe.extract_record(extractor, 'x')['file_name'] == 'upload.mp3'
+
+
+def test_from_buffer_rejects_unsupported_source():
+    with pytest.raises(TypeError):
+        smpe.MusicMetadataExtractor.from_buffer('not bytes')
+
+
+@pytest.mark.parametrize('hint', [None, 'aac', 'audio/aac'])
+def test_adts_buffer_matches_path(tmp_path, hint):
+    data = _adts()
+    path = tmp_path / 'raw.aac'
+    path.write_bytes(data)
+    expected = _record(path)
+    assert expected['format'] == 'AAC' and expected['duration']
+
+    extractor = smpe.MusicMetadataExtractor.from_buffer(data, format_hint=hint)
+    assert extractor.extension == '.aac'
+    assert _record(extractor) == expected
+
+
+# ==================== BufferReader ====================
+
+def test_buffer_reader_read_seek_tell():
+    data = bytes(range(100))
+    reader = smpe.BufferReader(data, 'b')
+    assert reader.read(10) == data[:10]
+    assert reader.tell() == 10
+    reader.seek(-5, io.SEEK_END)
+    assert reader.read() == data[-5:]
+    assert reader.read(10) == b''
+    reader.seek(200)
+    assert reader.read(1) == b''
+    reader.seek(10)
+    reader.seek(5, io.SEEK_CUR)
+    assert reader.read(3) == data[15:18]
+
+
+def test_buffer_reader_shares_memory():
+    data = bytearray(b'abcdef')
+    reader = smpe.BufferReader(data)
+    data[0:1] = b'X'
+    assert reader.read(2) == b'Xb'
+
+
+def test_buffer_reader_negative_seek_is_einval():
+    reader = smpe.BufferReader(b'abc')
+    with pytest.raises(OSError) as info:
+        reader.seek(-1)
+    assert info.value.errno == errno.EINVAL
+
+
+# ==================== 文件头识别与格式提示 ====================
+
+@pytest.mark.parametrize('header, expected', [
+    (b'fLaC\x00\x00\x00\x22', '.flac'),
+    (b'ID3\x04\x00\x00\x00\x00\x00\x00', '.mp3'),
+    (b'OggS' + b'\x00' * 24 + b'OpusHead', '.opus'),
+    (b'OggS' + b'\x00' * 24 + b'\x01vorbis', '.ogg'),
+    (b'OggS' + b'\x00' * 24 + b'Speex   ', ''),
+    (b'\x00\x00\x00\x20ftypM4A ', '.m4a'),
+    (b'\xff\xfb\x90\x64', '.mp3'),
+    (b'\xff\xf1\x50\x80', '.aac'),
+    (b'\xff\xf9\x50\x80', '.aac'),
+    (b'RIFF\x00\x00\x00\x00WAVE', ''),
+    (b'', ''),
+])
+def test_sniff_format(header, expected):
+    assert smpe.sniff_format(header) == expected
+
+
+@pytest.mark.parametrize('hint, expected', [
+    ('mp3', '.mp3'), ('.MP3', '.mp3'), (' audio/mpeg ', '.mp3'),
+    ('audio/x-flac', '.flac'), ('audio/mp4', '.m4a'), ('m4a', '.m4a'),
+    ('aac', '.aac'), ('audio/aac', '.aac'), ('audio/ogg', '.ogg'), ('opus', '.opus'),
+    ('wav', '.wav'), ('.wma', '.wma'),
+])
+def test_normalize_format_hint(hint, expected):
+    assert smpe.normalize_format_hint(hint) == expected
@@ -0,0 +1,161 @@
+"""
+命令行模式测试：各子命令的JSON输出与退出码
+"""
+
+import sys
+import json
+import subprocess
+
+import pytest
+
+from conftest import ROOT, make_mp3
+
+# extract 成功时每条记录的字段
+RECORD_FIELDS = [
+    'path', 'title', 'artist', 'album', 'track', 'disc', 'genre', 'year', 'composer', 'isrc',
+    'replaygain_track_gain', 'replaygain_track_peak', 'replaygain_album_gain', 'replaygain_album_peak',
+    'musicbrainz_trackid', 'musicbrainz_albumid', 'musicbrainz_artistid',
+    'lyrics', 'cover_size', 'cover_sha1', 'duration', 'format', 'file_name',
+]
+
+
+def run_cli(*args):
+    """运行命令行，返回 (退出码, 标准输出中的JSON记录列表, 标准错误)"""
+    result = subprocess.run([sys.executable, str(ROOT / 'music_metadata_mp3_fixed.py'), *map(str, args)],
+                            capture_output=True, text=True)
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    return result.returncode, records, result.stderr
+
+
+# ==================== extract ====================
+
+def test_extract_prints_one_record_per_file(sample_mp3, tmp_path):
+    other = make_mp3(tmp_path / 'other.mp3', title='Other')
+    code, records, _ = run_cli('extract', sample_mp3, other)
+    assert code == 0
+    assert [r['path'] for r in records] == [str(sample_mp3), str(other)]
+    first = records[0]
+    assert set(first) == set(RECORD_FIELDS)
+    assert (first['title'], first['album'], first['track'], first['format']) == ('Sample', 'Album', '1', 'MP3')
+    assert first['lyrics'] == '[00:00.00]la' and first['cover_size'] == 2048
+    assert records[1]['title'] == 'Other'
+
+
+def test_extract_pretty_output(sample_mp3):
+    result = subprocess.run([sys.executable, str(ROOT / 'music_metadata_mp3_fixed.py'), 'extract', '--pretty',
+                             str(sample_mp3)], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout.startswith('{\n  "path": ')
+    assert json.loads(result.stdout)['title'] == 'Sample'
+
+
+def test_extract_from_stdin(sample_mp3):
+    result = subprocess.run([sys.executable, str(ROOT / 'music_metadata_mp3_fixed.py'), 'extract', '-',
+                             '--format', 'mp3'], input=sample_mp3.read_bytes(), capture_output=True)
+    assert result.returncode == 0
+    record = json.loads(result.stdout)
+    assert (record['path'], record['file_name'], record['title']) == ('-', '<stdin>', 'Sample')
+
+
+def test_extract_error_sets_exit_code(sample_mp3, tmp_path):
+    missing = tmp_path / 'missing.mp3'
+    code, records, _ = run_cli('extract', sample_mp3, missing)
+    assert code == 1
+    assert records[0]['title'] == 'Sample'
+    assert records[1]['path'] == str(missing) and set(records[1]) == {'path', 'error'}
+
+
+# ==================== lyrics ====================
+
+def test_lyrics_prints_json(sample_mp3):
+    code, records, _ = run_cli('lyrics', sample_mp3)
+    assert code == 0
+    assert records == [{'path': str(sample_mp3), 'lyrics': '[00:00.00]la'}]
+
+
+def test_lyrics_saves_lrc(sample_mp3, tmp_path):
+    output = tmp_path / 'sample.lrc'
+    code, records, _ = run_cli('lyrics', sample_mp3, '-o', output)
+    assert code == 0
+    assert records == [{'path': str(sample_mp3), 'output': str(output)}]
+    assert 'la' in output.read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('name', ['plain.mp3', 'missing.mp3'])
+def test_lyrics_error(tmp_path, name):
+    path = tmp_path / name
+    if name == 'plain.mp3':
+        make_mp3(path)
+    code, records, _ = run_cli('lyrics', path)
+    assert code == 1
+    assert len(records) == 1 and records[0]['path'] == str(path) and set(records[0]) == {'path', 'error'}
+
+
+# ==================== cover ====================
+
+def test_cover_saves_image(sample_mp3, tmp_path):
+    output = tmp_path / 'cover.png'
+    code, records, _ = run_cli('cover', sample_mp3, '-o', output)
+    assert code == 0
+    assert records == [{'path': str(sample_mp3), 'output': str(output), 'size': 2048}]
+    assert output.stat().st_size == 2048
+
+
+@pytest.mark.parametrize('name', ['plain.mp3', 'missing.mp3'])
+def test_cover_error(tmp_path, name):
+    path = tmp_path / name
+    if name == 'plain.mp3':
+        make_mp3(path)
+    code, records, _ = run_cli('cover', path, '-o', tmp_path / 'cover.png')
+    assert code == 1
+    assert len(records) == 1 and set(records[0]) == {'path', 'error'}
+    assert not (tmp_path / 'cover.png').exists()
+
+
+# ==================== debug ====================
+
+def test_debug_lists_frames(sample_mp3):
+    code, records, _ = run_cli('debug', sample_mp3)
+    assert code == 0
+    record, = records
+    assert record['path'] == str(sample_mp3)
+    ids = [frame['id'] for frame in record['frames']]
+    assert {'TIT2', 'TPE1', 'TALB', 'TRCK'} <= set(ids)
+    assert any(i.startswith('USLT') for i in ids) and any(i.startswith('APIC') for i in ids)
+    assert {'id': 'TIT2', 'type': 'TIT2', 'text': ['Sample']} in record['frames']
+
+
+def test_debug_error(tmp_path):
+    missing = tmp_path / 'missing.mp3'
+    code, records, _ = run_cli('debug', missing)
+    assert code == 1
+    assert len(records) == 1 and records[0]['path'] == str(missing) and set(records[0]) == {'path', 'error'}
+
+
+# ==================== scan ====================
+
+def test_scan_prints_json_summary(library, tmp_path):
+    manifest = tmp_path / 'manifest.txt'
+    code, records, _ = run_cli('manifest', library, '-o', manifest)
+    assert code == 0 and records == []
+
+    out = tmp_path / 'out'
+    code, records, stderr = run_cli('scan', '--manifest', manifest, '--shard', '0', '--output-dir', out)
+    assert code == 0
+    assert records == [{'shard': 0, 'num_shards': 1, 'output': str(out / 'part-00000-of-00001.jsonl'),
+                        'files': 40, 'failed': 0}]
+    assert '✅' in stderr
+
+    # 已完成的分片在 --resume 时同样输出摘要
+    code, again, _ = run_cli('scan', '--manifest', manifest, '--shard', '0', '--output-dir', out, '--resume')
+    assert code == 0 and again == records
+
+
+def test_scan_local_prints_one_summary_per_shard(library, tmp_path):
+    manifest = tmp_path / 'manifest.txt'
+    run_cli('manifest', library, '-o', manifest)
+    code, records, _ = run_cli('scan', '--manifest', manifest, '--num-shards', '3', '--local',
+                               '--output-dir', tmp_path / 'out')
+    assert code == 0
+    assert sorted(r['shard'] for r in records) == [0, 1, 2]
+    assert sum(r['files'] for r in records) == 40
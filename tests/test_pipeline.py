@@ -0,0 +1,100 @@
+"""
+流水线背压测试：内存预算的阻塞与放行、慢速消费者下在途数据不超出预算
+"""
+
+import time
+import threading
+
+import pytest
+
+import smpe_batch
+from conftest import make_library
+
+
+def _acquire_in_thread(budget, size):
+    """在后台线程中申请预算，返回 (线程, 结果)；结果为 'ok' 或抛出的异常"""
+    result = []
+
+    def run():
+        try:
+            budget.acquire(size)
+            result.append('ok')
+        except BaseException as e:
+            result.append(e)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, result
+
+
+# ==================== MemoryBudget ====================
+
+def test_budget_blocks_above_limit_until_release():
+    budget = smpe_batch.MemoryBudget(100, threading.Event())
+    budget.acquire(60)
+    budget.acquire(40)
+    thread, result = _acquire_in_thread(budget, 10)
+    thread.join(0.3)
+    assert thread.is_alive() and result == []
+
+    budget.release(60)
+    thread.join(5)
+    assert result == ['ok']
+    assert (budget.used, budget.peak) == (50, 100)
+    assert budget.blocked_seconds > 0
+
+
+def test_budget_lets_oversized_item_through_when_empty():
+    budget = smpe_batch.MemoryBudget(100, threading.Event())
+    budget.acquire(500)
+    assert (budget.used, budget.peak) == (500, 500)
+
+    # 已有在途数据时，超大的申请要等到预算清空
+    thread, result = _acquire_in_thread(budget, 500)
+    thread.join(0.3)
+    assert result == []
+    budget.release(500)
+    thread.join(5)
+    assert result == ['ok'] and budget.used == 500
+
+
+def test_budget_stop_aborts_waiting_acquire():
+    stop = threading.Event()
+    budget = smpe_batch.MemoryBudget(100, stop)
+    budget.acquire(80)
+    thread, result = _acquire_in_thread(budget, 80)
+    thread.join(0.3)
+    assert result == []
+
+    stop.set()
+    thread.join(5)
+    assert len(result) == 1 and isinstance(result[0], smpe_batch._Aborted)
+    assert budget.used == 80
+
+    with pytest.raises(smpe_batch._Aborted):
+        budget.acquire(80)
+
+
+# ==================== ScanPipeline ====================
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_slow_consumer_stays_within_memory_budget(tmp_path, workers):
+    cover_size = 32 * 1024
+    library = make_library(tmp_path / 'library', 30, frames=5, dirs=3, cover_size=cover_size)
+    entries = sorted(p.relative_to(library).as_posix() for p in library.rglob('*.mp3'))
+    # 预算只够同时容纳约3条带封面的结果
+    budget = 3 * (smpe_batch.ITEM_OVERHEAD + cover_size + 1024)
+
+    pipeline = smpe_batch.ScanPipeline(library, smpe_batch._iter_units(library, enumerate(entries)),
+                                       workers=workers, prefetch=0, memory_budget=budget, keep_metadata=True)
+    seen = []
+    for seq, entry, record, metadata in pipeline:
+        assert record['cover_size'] == cover_size and metadata['cover']
+        seen.append(entry)
+        time.sleep(0.01)
+
+    assert sorted(seen) == entries
+    memory = pipeline.metrics()['memory']
+    assert memory['budget'] == budget
+    assert cover_size < memory['peak'] <= budget
+    assert memory['used'] == 0
+    assert memory['blocked_seconds'] > 0
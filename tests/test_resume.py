@@ -0,0 +1,249 @@
+"""
+检查点恢复与分片合并测试：中断（Ctrl-C / 进程被杀）后 --resume 的输出与一次跑完完全相同
+"""
+
+import sys
+import json
+import time
+import signal
+import subprocess
+
+import pytest
+
+import smpe_batch
+from conftest import ROOT, make_library
+
+
+def _manifest(library, tmp_path):
+    manifest = tmp_path / 'manifest.txt'
+    smpe_batch.build_manifest(library, manifest)
+    return manifest
+
+
+def _reference(manifest, tmp_path, num_shards=1):
+    """不中断地扫描一遍，返回各分片输出的字节"""
+    return [smpe_batch.scan_shard(manifest, i, num_shards, tmp_path / 'reference').read_bytes()
+            for i in range(num_shards)]
+
+
+def _interrupt_after(monkeypatch, count):
+    """在写出第count条记录时模拟Ctrl-C"""
+    original = smpe_batch._dump_record
+    calls = [0]
+
+    def dump(record):
+        calls[0] += 1
+        if calls[0] == count:
+            raise KeyboardInterrupt
+        return original(record)
+    monkeypatch.setattr(smpe_batch, '_dump_record', dump)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_resume_after_interrupt_matches_uninterrupted(library, tmp_path, monkeypatch, workers):
+    manifest = _manifest(library, tmp_path)
+    expected, = _reference(manifest, tmp_path)
+    out = tmp_path / 'out'
+
+    _interrupt_after(monkeypatch, 17)
+    with pytest.raises(KeyboardInterrupt):
+        smpe_batch.scan_shard(manifest, 0, 1, out, checkpoint_every=5, workers=workers)
+    monkeypatch.undo()
+
+    final = out / smpe_batch.shard_file_name(0, 1)
+    assert not final.exists()
+    assert final.with_name(final.name + '.journal').exists()
+
+    smpe_batch.scan_shard(manifest, 0, 1, out, resume=True, checkpoint_every=5, workers=workers)
+    assert final.read_bytes() == expected
+    assert sorted(p.name for p in out.iterdir()) == [final.name]
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_resume_after_interrupt_during_export(library, tmp_path, monkeypatch, workers):
+    manifest = _manifest(library, tmp_path)
+    expected, = _reference(manifest, tmp_path)
+    out = tmp_path / 'out'
+    export = tmp_path / 'export'
+
+    # 记录已写出、导出尚未完成时收到Ctrl-C
+    original = smpe_batch.MetadataSaver.save_all
+    calls = [0]
+
+    def save_all(metadata, base_dir='.', verbose=True):
+        calls[0] += 1
+        if calls[0] == 12:
+            raise KeyboardInterrupt
+        return original(metadata, base_dir, verbose)
+    monkeypatch.setattr(smpe_batch.MetadataSaver, 'save_all', staticmethod(save_all))
+    with pytest.raises(KeyboardInterrupt):
+        smpe_batch.scan_shard(manifest, 0, 1, out, checkpoint_every=5, workers=workers, export_dir=export)
+    monkeypatch.undo()
+
+    smpe_batch.scan_shard(manifest, 0, 1, out, resume=True, checkpoint_every=5, workers=workers,
+                          export_dir=export)
+    assert (out / smpe_batch.shard_file_name(0, 1)).read_bytes() == expected
+    exported = sorted(p.relative_to(export).as_posix() for p in export.rglob('*_metadata.txt'))
+    assert exported == sorted(p.relative_to(library).as_posix().replace('.mp3', '_metadata.txt')
+                              for p in library.rglob('*.mp3'))
+
+
+def test_resume_with_small_schedule_window(library, tmp_path, monkeypatch):
+    manifest = _manifest(library, tmp_path)
+    expected, = _reference(manifest, tmp_path)
+    out = tmp_path / 'out'
+    options = dict(checkpoint_every=3, workers=4, scheduler='inode', schedule_window=7)
+
+    _interrupt_after(monkeypatch, 19)
+    with pytest.raises(KeyboardInterrupt):
+        smpe_batch.scan_shard(manifest, 0, 1, out, **options)
+    monkeypatch.undo()
+
+    smpe_batch.scan_shard(manifest, 0, 1, out, resume=True, **options)
+    assert (out / smpe_batch.shard_file_name(0, 1)).read_bytes() == expected
+
+
+def test_resume_discards_output_written_after_last_checkpoint(library, tmp_path, monkeypatch):
+    manifest = _manifest(library, tmp_path)
+    expected, = _reference(manifest, tmp_path)
+    out = tmp_path / 'out'
+
+    _interrupt_after(monkeypatch, 23)
+    with pytest.raises(KeyboardInterrupt):
+        smpe_batch.scan_shard(manifest, 0, 1, out, checkpoint_every=5)
+    monkeypatch.undo()
+
+    # 模拟进程被杀：检查点之后还写出了记录（含半行），日志最后一行也只写了一半
+    final = out / smpe_batch.shard_file_name(0, 1)
+    with open(final.with_name(final.name + '.unsorted'), 'ab') as f:
+        f.write(b'{"path": "d00/00000.mp3", "title": "stale"}\n{"path": "d01/000')
+    with open(final.with_name(final.name + '.journal'), 'a', encoding='utf-8') as f:
+        f.write('{"offset": 999999')
+
+    smpe_batch.scan_shard(manifest, 0, 1, out, resume=True, checkpoint_every=5)
+    assert final.read_bytes() == expected
+
+
+def test_resume_of_finished_shard_is_a_no_op(library, tmp_path):
+    manifest = _manifest(library, tmp_path)
+    final = smpe_batch.scan_shard(manifest, 0, 1, tmp_path / 'out')
+    before = final.read_bytes()
+    assert smpe_batch.scan_shard(manifest, 0, 1, tmp_path / 'out', resume=True) == final
+    assert final.read_bytes() == before
+
+
+@pytest.mark.parametrize('sig', [signal.SIGINT, signal.SIGKILL])
+def test_cli_resume_after_signal(tmp_path, sig):
+    library = make_library(tmp_path / 'library', 400, frames=5)
+    manifest = _manifest(library, tmp_path)
+    expected, = _reference(manifest, tmp_path)
+    out = tmp_path / 'out'
+    journal = out / (smpe_batch.shard_file_name(0, 1) + '.journal')
+
+    cmd = [sys.executable, str(ROOT / 'music_metadata_mp3_fixed.py'), 'scan', '--manifest', str(manifest),
+           '--shard', '0', '--output-dir', str(out), '--checkpoint-every', '10']
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while proc.poll() is None and time.monotonic() < deadline:
+        if journal.exists() and journal.read_text(encoding='utf-8').count('\n') >= 2:
+            proc.send_signal(sig)
+            break
+        time.sleep(0.002)
+    returncode = proc.wait()
+    if returncode == 0:
+        pytest.skip('扫描在发出信号前已完成')
+    assert returncode == (130 if sig == signal.SIGINT else -signal.SIGKILL)
+
+    subprocess.run(cmd + ['--resume'], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    assert (out / smpe_batch.shard_file_name(0, 1)).read_bytes() == expected
+
+
+# ==================== 有界的进度与排序 ====================
+
+def test_done_set_keeps_only_seqs_above_watermark():
+    done = smpe_batch.DoneSet()
+    for seq in [2, 0, 3, 1, 5]:
+        done.add(seq)
+    assert done.watermark == 4
+    assert len(done) == 5
+    assert [seq in done for seq in range(7)] == [True] * 4 + [False, True, False]
+    assert done._above == {5}
+
+
+def test_schedule_windows_keep_archive_members_together(tmp_path, monkeypatch):
+    entries = ['a.mp3', 'b.zip!1.mp3', 'b.zip!2.mp3', 'b.zip!3.mp3', 'c.mp3', 'c.mp3', 'd.mp3']
+    seen = []
+    original = smpe_batch.SCHEDULERS['manifest']
+
+    def record_window(base, window):
+        seen.append(window)
+        return original(base, window)
+
+    monkeypatch.setitem(smpe_batch.SCHEDULERS, 'manifest', record_window)
+    items = list(smpe_batch.schedule_windows(tmp_path, enumerate(entries), 'manifest', window=2))
+    assert items == list(enumerate(entries))
+    assert seen == [['a.mp3', 'b.zip!1.mp3', 'b.zip!2.mp3', 'b.zip!3.mp3'], ['c.mp3', 'c.mp3'], ['d.mp3']]
+
+
+def test_manifest_is_sorted(library, tmp_path):
+    root, entries = smpe_batch.read_manifest(_manifest(library, tmp_path))
+    entries = list(entries)
+    assert root == library.resolve().as_posix()
+    assert len(entries) == 40
+    assert entries == sorted(entries)
+
+
+def test_sort_partial_in_chunks_matches_single_chunk(tmp_path):
+    records = [{'path': f'{i * 7 % 50:02d}.mp3', 'n': i} for i in range(200)]
+    src = tmp_path / 'unsorted'
+    src.write_text(''.join(smpe_batch._dump_record(r) for r in records), encoding='utf-8')
+
+    smpe_batch._sort_partial(src, tmp_path / 'one')
+    smpe_batch._sort_partial(src, tmp_path / 'many', chunk_size=300)
+    assert (tmp_path / 'many').read_bytes() == (tmp_path / 'one').read_bytes()
+    # path 相同的记录保持写出顺序
+    assert list(smpe_batch._iter_partial(tmp_path / 'one')) == sorted(records, key=lambda r: r['path'])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['many', 'one', 'unsorted']
+
+
+# ==================== 分片合并 ====================
+
+def _write_part(output_dir, index, num_shards, records):
+    output_dir.mkdir(exist_ok=True)
+    path = output_dir / smpe_batch.shard_file_name(index, num_shards)
+    path.write_text(''.join(smpe_batch._dump_record(r) for r in records), encoding='utf-8')
+
+
+def test_merge_dedups_by_path_preferring_success(tmp_path):
+    parts = tmp_path / 'parts'
+    _write_part(parts, 0, 2, [{'path': 'a.mp3', 'error': '解析失败'}, {'path': 'c.mp3', 'title': 'C'}])
+    _write_part(parts, 1, 2, [{'path': 'a.mp3', 'title': 'A'}, {'path': 'b.mp3', 'error': 'y'},
+                              {'path': 'c.mp3', 'title': 'C'}])
+
+    merged = smpe_batch.merge_shards(parts, tmp_path / 'merged.jsonl')
+    records = [json.loads(line) for line in merged.read_text(encoding='utf-8').splitlines()]
+    assert records == [{'path': 'a.mp3', 'title': 'A'}, {'path': 'b.mp3', 'error': 'y'},
+                       {'path': 'c.mp3', 'title': 'C'}]
+
+
+def test_merge_tie_break_is_independent_of_shard_order(tmp_path):
+    first = {'path': 'a.mp3', 'error': 'x'}
+    second = {'path': 'a.mp3', 'error': 'y'}
+    for name, order in (('one', [first, second]), ('two', [second, first])):
+        parts = tmp_path / name
+        _write_part(parts, 0, 2, [order[0]])
+        _write_part(parts, 1, 2, [order[1]])
+        smpe_batch.merge_shards(parts, tmp_path / f'{name}.jsonl')
+    assert (tmp_path / 'one.jsonl').read_bytes() == (tmp_path / 'two.jsonl').read_bytes()
+
+
+def test_sharded_scan_merges_to_single_shard_result(library, tmp_path):
+    manifest = _manifest(library, tmp_path)
+    for index in range(3):
+        smpe_batch.scan_shard(manifest, index, 3, tmp_path / 'three')
+    smpe_batch.scan_shard(manifest, 0, 1, tmp_path / 'one')
+
+    three = smpe_batch.merge_shards(tmp_path / 'three', tmp_path / 'three.jsonl')
+    one = smpe_batch.merge_shards(tmp_path / 'one', tmp_path / 'one.jsonl')
+    assert three.read_bytes() == one.read_bytes()
+    assert len(one.read_text(encoding='utf-8').splitlines()) == 40
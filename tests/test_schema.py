@@ -0,0 +1,109 @@
+"""
+标签字段表测试：同一组扩展字段从ID3和Vorbis注释中取出相同的值
+"""
+
+import pytest
+
+import smpe_core as smpe
+from _samples import make_mp3, make_flac
+
+EXPECTED = {
+    'track': '3',
+    'disc': '1',
+    'genre': 'Rock',
+    'year': '2019',
+    'composer': 'Composer',
+    'isrc': 'USRC17607839',
+    'replaygain_track_gain': '-6.50 dB',
+    'replaygain_track_peak': '0.988',
+    'replaygain_album_gain': '-7.10 dB',
+    'replaygain_album_peak': '0.999',
+    'musicbrainz_trackid': 'e4a2b5d7-1c51-4d8b-9f8a-0d3c6f1b2a11',
+    'musicbrainz_albumid': '0b2ce52c-9a2d-4ea6-9e8b-8d1e2f3c4b5a',
+    'musicbrainz_artistid': '7f3a1c0e-5b2d-4e6f-8a9b-1c2d3e4f5a6b',
+}
+
+REPLAYGAIN_DESCS = {
+    'replaygain_track_gain': 'REPLAYGAIN_TRACK_GAIN',
+    'replaygain_track_peak': 'REPLAYGAIN_TRACK_PEAK',
+    'replaygain_album_gain': 'REPLAYGAIN_ALBUM_GAIN',
+    'replaygain_album_peak': 'REPLAYGAIN_ALBUM_PEAK',
+}
+
+
+def _id3_sample(path, replaygain_case=str.upper):
+    from mutagen.id3 import TPOS, TCON, TDRC, TCOM, TSRC, TXXX, UFID
+
+    frames = [
+        TPOS(encoding=3, text='1'),
+        TCON(encoding=3, text='Rock'),
+        TDRC(encoding=3, text='2019-05-01'),
+        TCOM(encoding=3, text='Composer'),
+        TSRC(encoding=3, text=EXPECTED['isrc']),
+        UFID(owner='http://musicbrainz.org', data=EXPECTED['musicbrainz_trackid'].encode('ascii')),
+        TXXX(encoding=3, desc='MusicBrainz Album Id', text=EXPECTED['musicbrainz_albumid']),
+        TXXX(encoding=3, desc='MusicBrainz Artist Id', text=EXPECTED['musicbrainz_artistid']),
+    ]
+    frames += [TXXX(encoding=3, desc=replaygain_case(desc), text=EXPECTED[field])
+               for field, desc in REPLAYGAIN_DESCS.items()]
+    return make_mp3(path, track='3/12', extra=frames)
+
+
+def _vorbis_sample(path):
+    tags = {'title': 'Sample', 'artist': 'SMPE', 'tracknumber': '3/12', 'discnumber': '1', 'date': '2019-05-01'}
+    tags.update({field: EXPECTED[field] for field in EXPECTED if field not in ('track', 'disc', 'year')})
+    return make_flac(path, tags=tags)
+
+
+def _fields(path):
+    record = smpe.extract_record(path, 'x')
+    assert 'error' not in record
+    return {field: record[field] for field in EXPECTED}
+
+
+@pytest.mark.parametrize('case', [str.upper, str.lower])
+def test_id3_fields(tmp_path, case):
+    assert _fields(_id3_sample(tmp_path / 'sample.mp3', case)) == EXPECTED
+
+
+def test_vorbis_fields(tmp_path):
+    record = smpe.extract_record(_vorbis_sample(tmp_path / 'sample.flac'), 'x')
+    assert record['format'] == 'FLAC'
+    assert (record['title'], record['artist']) == ('Sample', 'SMPE')
+    assert _fields(tmp_path / 'sample.flac') == EXPECTED
+
+
+def test_vorbis_keys_are_case_insensitive(tmp_path):
+    path = make_flac(tmp_path / 'upper.flac', tags={'TRACKNUMBER': '7/9', 'REPLAYGAIN_TRACK_GAIN': '-1.00 dB',
+                                                   'MUSICBRAINZ_TRACKID': 'abc'})
+    record = smpe.extract_record(path, 'x')
+    assert (record['track'], record['replaygain_track_gain'], record['musicbrainz_trackid']) == \
+        ('7', '-1.00 dB', 'abc')
+
+
+@pytest.mark.parametrize('track, expected', [('3/12', '3'), ('3', '3'), ('12/', '12')])
+def test_track_number_keeps_position(tmp_path, track, expected):
+    assert smpe.extract_record(make_mp3(tmp_path / 'a.mp3', track=track), 'x')['track'] == expected
+    flac = make_flac(tmp_path / 'a.flac', tags={'tracknumber': track})
+    assert smpe.extract_record(flac, 'x')['track'] == expected
+
+
+def test_missing_fields_are_none(tmp_path):
+    record = smpe.extract_record(make_mp3(tmp_path / 'plain.mp3'), 'x')
+    assert all(record[field] is None for field in EXPECTED)
+
+
+# ==================== 查找计划 ====================
+
+def test_field_plan_is_compiled_once_per_family():
+    for family in smpe.TAG_FAMILIES:
+        plan = smpe.compile_field_plan(family)
+        assert smpe.compile_field_plan(family) is plan
+        assert [field for field, _, _ in plan] == list(smpe.TAG_SCHEMA)
+
+
+def test_id3_plan_uses_lowercase_txxx_keys():
+    keys = {field: key for field, key, _ in smpe.compile_field_plan('id3')}
+    assert keys['replaygain_track_gain'] == 'TXXX:replaygain_track_gain'
+    assert keys['musicbrainz_albumid'] == 'TXXX:musicbrainz album id'
+    assert keys['musicbrainz_trackid'] == 'UFID:http://musicbrainz.org'